@@ -0,0 +1,53 @@
+"""Unique index on genres.name
+
+Revision ID: a3c9e1f2b7d4
+Revises: bdf51b18f128
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9e1f2b7d4'
+down_revision: Union[str, Sequence[str], None] = 'bdf51b18f128'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Each duplicate genre row mapped to the lowest id sharing its name
+_DUPLICATES = """
+    SELECT g.id AS dup_id,
+           (SELECT MIN(g2.id) FROM genres g2 WHERE g2.name = g.name) AS keep_id
+    FROM genres g
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Merge duplicate genres onto the surviving row before the unique index can be built.
+    op.execute(sa.text(f"""
+        INSERT INTO book_genre (book_id, genre_id)
+        SELECT DISTINCT bg.book_id, d.keep_id
+        FROM book_genre bg JOIN ({_DUPLICATES}) d ON bg.genre_id = d.dup_id
+        WHERE d.dup_id <> d.keep_id
+        ON CONFLICT DO NOTHING
+    """))
+    op.execute(sa.text(f"""
+        DELETE FROM book_genre WHERE genre_id IN (
+            SELECT dup_id FROM ({_DUPLICATES}) d WHERE d.dup_id <> d.keep_id
+        )
+    """))
+    op.execute(sa.text(f"""
+        DELETE FROM genres WHERE id IN (
+            SELECT dup_id FROM ({_DUPLICATES}) d WHERE d.dup_id <> d.keep_id
+        )
+    """))
+    op.create_index(op.f('ix_genres_name'), 'genres', ['name'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_genres_name'), table_name='genres')
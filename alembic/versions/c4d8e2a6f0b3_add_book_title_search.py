@@ -0,0 +1,80 @@
+"""Add full-text search over book titles
+
+Revision ID: c4d8e2a6f0b3
+Revises: f1a7c3e9d2b5
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d8e2a6f0b3'
+down_revision: Union[str, Sequence[str], None] = 'f1a7c3e9d2b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Keep in sync with the DDL attached to the books table in app/models.
+_POSTGRES_UPGRADE = [
+    "ALTER TABLE books ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    """CREATE OR REPLACE FUNCTION books_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := to_tsvector('english', coalesce(NEW.title, ''));
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS books_search_vector_trigger ON books",
+    """CREATE TRIGGER books_search_vector_trigger BEFORE INSERT OR UPDATE OF title ON books
+    FOR EACH ROW EXECUTE FUNCTION books_search_vector_update()""",
+    "UPDATE books SET search_vector = to_tsvector('english', coalesce(title, ''))",
+]
+_SQLITE_UPGRADE = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS books_fts
+    USING fts5(title, content='books', content_rowid='id', tokenize='porter unicode61')""",
+    """CREATE TRIGGER IF NOT EXISTS books_fts_insert AFTER INSERT ON books BEGIN
+        INSERT INTO books_fts(rowid, title) VALUES (new.id, new.title);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS books_fts_delete AFTER DELETE ON books BEGIN
+        INSERT INTO books_fts(books_fts, rowid, title) VALUES ('delete', old.id, old.title);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS books_fts_update AFTER UPDATE OF title ON books BEGIN
+        INSERT INTO books_fts(books_fts, rowid, title) VALUES ('delete', old.id, old.title);
+        INSERT INTO books_fts(rowid, title) VALUES (new.id, new.title);
+    END""",
+    "INSERT INTO books_fts(books_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in _SQLITE_UPGRADE:
+            op.execute(statement)
+        return
+    if dialect != 'postgresql':
+        return
+    for statement in _POSTGRES_UPGRADE:
+        op.execute(statement)
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction on PostgreSQL.
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_books_search_vector ON books USING GIN (search_vector)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for trigger in ('books_fts_insert', 'books_fts_delete', 'books_fts_update'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS books_fts")
+        return
+    if dialect != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_books_search_vector")
+    op.execute("DROP TRIGGER IF EXISTS books_search_vector_trigger ON books")
+    op.execute("DROP FUNCTION IF EXISTS books_search_vector_update()")
+    op.execute("ALTER TABLE books DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,53 @@
+"""Add composite indexes for GET /books filters and sorts
+
+Revision ID: d2f6b8e4c0a7
+Revises: c4d8e2a6f0b3
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f6b8e4c0a7'
+down_revision: Union[str, Sequence[str], None] = 'c4d8e2a6f0b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns)
+_INDEXES = [
+    ('ix_books_author_id_id', 'books', ['author_id', 'id']),
+    ('ix_books_author_id_published_year_id', 'books', ['author_id', 'published_year', 'id']),
+    ('ix_books_created_by_id_id', 'books', ['created_by_id', 'id']),
+    ('ix_books_published_year_id', 'books', ['published_year', 'id']),
+    ('ix_books_isbn', 'books', ['isbn']),
+    ('ix_book_genre_genre_id_book_id', 'book_genre', ['genre_id', 'book_id']),
+]
+# Single-column indexes from e5b2d8c4a1f6 whose leading column is covered by a composite above.
+_SUPERSEDED = [
+    ('ix_books_author_id', 'books', ['author_id']),
+    ('ix_books_created_by_id', 'books', ['created_by_id']),
+    ('ix_book_genre_genre_id', 'book_genre', ['genre_id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction on PostgreSQL.
+    # The replacements are built before the superseded indexes are dropped.
+    with op.get_context().autocommit_block():
+        for name, table, columns in _INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+        for name, table, _columns in _SUPERSEDED:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in _SUPERSEDED:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+        for name, table, _columns in reversed(_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
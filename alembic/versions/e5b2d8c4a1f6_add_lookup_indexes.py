@@ -0,0 +1,71 @@
+"""Add indexes for hot lookup columns
+
+Revision ID: e5b2d8c4a1f6
+Revises: a3c9e1f2b7d4
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b2d8c4a1f6'
+down_revision: Union[str, Sequence[str], None] = 'a3c9e1f2b7d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# genres.name already got its unique index in a3c9e1f2b7d4.
+# (index name, table, columns, unique)
+_INDEXES = [
+    ('ix_books_author_id', 'books', ['author_id'], False),
+    ('ix_books_created_by_id', 'books', ['created_by_id'], False),
+    ('ix_users_username', 'users', ['username'], True),
+    ('ix_book_genre_genre_id', 'book_genre', ['genre_id'], False),
+]
+
+
+def _duplicate_usernames(bind) -> list:
+    users = sa.table('users', sa.column('username', sa.String))
+    query = sa.select(users.c.username).group_by(users.c.username).having(sa.func.count() > 1).limit(10)
+    return list(bind.scalars(query))
+
+
+def _is_invalid_index(bind, name: str) -> bool:
+    """True for an index left INVALID by an interrupted CREATE INDEX CONCURRENTLY (if_not_exists would keep it)."""
+    if bind.dialect.name != 'postgresql':
+        return False
+    query = sa.text(
+        'SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid '
+        'WHERE c.relname = :name AND NOT i.indisvalid'
+    )
+    return bind.execute(query, {'name': name}).first() is not None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    duplicates = _duplicate_usernames(bind)
+    if duplicates:
+        raise RuntimeError(
+            f'Cannot create unique index ix_users_username: duplicate usernames exist (e.g. {duplicates}). '
+            'Rename or remove the duplicates, then re-run the migration.'
+        )
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction on PostgreSQL.
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in _INDEXES:
+            if _is_invalid_index(bind, name):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
+            op.create_index(
+                name, table, columns, unique=unique,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _columns, _unique in reversed(_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
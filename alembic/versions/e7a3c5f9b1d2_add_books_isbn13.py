@@ -0,0 +1,96 @@
+"""Add normalized, unique books.isbn13
+
+Revision ID: e7a3c5f9b1d2
+Revises: d2f6b8e4c0a7
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+import logging
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3c5f9b1d2'
+down_revision: Union[str, Sequence[str], None] = 'd2f6b8e4c0a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_BATCH_SIZE = 1000
+_ISBN_PATTERN = re.compile(r'[0-9]{9}[0-9X]|[0-9]{13}')
+
+log = logging.getLogger('alembic.runtime.migration')
+
+
+def _isbn13(isbn):
+    """Frozen copy of app.schemas.validators.normalize_isbn as of this revision."""
+    if not isbn:
+        return None
+    clean = isbn.replace('-', '').replace(' ', '').upper()
+    # ASCII digits only: str.isdigit() would let through characters int() cannot parse
+    if not _ISBN_PATTERN.fullmatch(clean):
+        return None
+    if len(clean) == 13:
+        return clean
+    core = '978' + clean[:9]
+    total = sum(int(digit) * (3 if i % 2 else 1) for i, digit in enumerate(core))
+    return core + str((10 - total % 10) % 10)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('books', sa.Column('isbn13', sa.String(length=13), nullable=True))
+
+    # Backfill in id order; when several rows normalize to the same ISBN the oldest keeps it and the others
+    # are left NULL (their raw isbn is untouched) so the unique index can be built.
+    bind = op.get_bind()
+    books = sa.table('books', sa.column('id', sa.Integer), sa.column('isbn', sa.String), sa.column('isbn13', sa.String))
+    seen = set()
+    duplicates = []
+    last_id = None
+    while True:
+        query = sa.select(books.c.id, books.c.isbn).where(books.c.isbn.is_not(None)).order_by(books.c.id)
+        if last_id is not None:
+            query = query.where(books.c.id > last_id)
+        rows = bind.execute(query.limit(_BATCH_SIZE)).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        updates = []
+        for book_id, isbn in rows:
+            isbn13 = _isbn13(isbn)
+            if isbn13 is None:
+                continue
+            if isbn13 in seen:
+                duplicates.append(book_id)
+                continue
+            seen.add(isbn13)
+            updates.append({'b_id': book_id, 'b_isbn13': isbn13})
+        if updates:
+            bind.execute(
+                books.update().where(books.c.id == sa.bindparam('b_id')).values(isbn13=sa.bindparam('b_isbn13')),
+                updates,
+            )
+    if duplicates:
+        log.warning(
+            'isbn13 left NULL for %d books sharing an ISBN with an older book: %s', len(duplicates), duplicates
+        )
+
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction on PostgreSQL.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_books_isbn13', 'books', ['isbn13'], unique=True, postgresql_concurrently=True, if_not_exists=True
+        )
+        # The raw-isbn index from d2f6b8e4c0a7 is superseded: filters and lookups now use isbn13.
+        op.drop_index('ix_books_isbn', table_name='books', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_books_isbn', 'books', ['isbn'], postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_books_isbn13', table_name='books', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('books', 'isbn13')
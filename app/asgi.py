@@ -0,0 +1,121 @@
+"""ASGI serving mode: hot catalog reads on async SQLAlchemy, everything else through the Flask app.
+
+GET /books, /books/search, /books/isbn/<isbn>, /books/<id> and /authors/<id>/books are native async routes.
+They check out an AsyncSession (asyncpg / aiosqlite) and run the very same payload builders as the Flask views
+(app.routers.books / app.routers.authors) through ``AsyncSession.run_sync``, so validation, queries and business
+rules are shared, while waiting on the database no longer ties up a server thread. Those routes answer with the
+same ETags, 304s, compression and error bodies as the WSGI app, but skip the in-process response cache and
+request coalescing, which are built around Flask's request context.
+
+Any other request (writes, auth, export, docs, metrics) falls through to the Flask app, mounted as WSGI.
+Serve with ``SERVER_MODE=asgi python run.py`` or ``uvicorn app.asgi:app``.
+"""
+import time
+from datetime import timezone
+
+from a2wsgi import WSGIMiddleware
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import http_date, parse_accept_header, parse_date, parse_etags, quote_etag
+
+from app.async_database import async_engine, async_session_scope
+from app.compression import COMPRESSED_TOTAL, compress, encoded_etag, negotiate_encoding
+from app.conditional import catalog_etag, not_modified_etag
+from app.json_provider import dumpb
+from app.main import app as flask_app
+from app.metrics import REQUEST_DURATION, REQUESTS_IN_FLIGHT, REQUESTS_TOTAL, instrument_engine
+from app.routers.authors import author_books
+from app.routers.books import book_by_id, book_by_isbn, books_listing, books_search
+from app.services import get_catalog_version
+
+app = FastAPI(title="Books API", docs_url=None, redoc_url=None, openapi_url=None)
+
+instrument_engine(async_engine.sync_engine)
+
+
+def _error(status: int, message: str) -> Response:
+    return Response(dumpb({"error": message}), status_code=status, media_type="application/json")
+
+
+@app.exception_handler(Exception)
+async def _unhandled_exception(_request: Request, e: Exception):
+    flask_app.logger.exception("Unhandled exception in async route: %s", e)
+    return _error(500, "Internal server error")
+
+
+def _validators(updated_at) -> dict:
+    return {"Last-Modified": http_date(updated_at.replace(tzinfo=timezone.utc))} if updated_at is not None else {}
+
+
+def _json_response(request: Request, body: bytes, etag: str, updated_at) -> Response:
+    headers = {"ETag": quote_etag(etag), "Vary": "Accept-Encoding", **_validators(updated_at)}
+    encoding = negotiate_encoding(len(body), parse_accept_header(request.headers.get("accept-encoding")))
+    if encoding is not None:
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+        headers["ETag"] = quote_etag(encoded_etag(etag, encoding))
+        COMPRESSED_TOTAL.inc((encoding,))
+    return Response(body, status_code=200, media_type="application/json", headers=headers)
+
+
+async def _conditional_read(request: Request, payload_fn, *path_args) -> Response:
+    full_path = f"{request.url.path}?{request.url.query}"
+    if_none_match = parse_etags(request.headers.get("if-none-match"))
+    if_modified_since = parse_date(request.headers.get("if-modified-since"))
+    try:
+        async with async_session_scope() as session:
+            version, updated_at = await session.run_sync(get_catalog_version)
+            etag = catalog_etag(version, full_path)
+            matched = not_modified_etag(etag, updated_at, if_none_match, if_modified_since)
+            if matched:
+                return Response(status_code=304, headers={"ETag": quote_etag(matched), **_validators(updated_at)})
+            payload = await session.run_sync(payload_fn, *path_args, request.query_params)
+    except HTTPException as e:
+        return _error(e.code, e.description)
+    return _json_response(request, dumpb(payload), etag, updated_at)
+
+
+async def _catalog_read(request: Request, endpoint: str, payload_fn, *path_args) -> Response:
+    """Serve ``payload_fn(session, *path_args, query_params)`` as a conditional GET.
+
+    Metrics are recorded under the Flask view's endpoint name, so dashboards line up across serving modes.
+    """
+    started_at = time.perf_counter()
+    REQUESTS_IN_FLIGHT.inc()
+    try:
+        response = await _conditional_read(request, payload_fn, *path_args)
+    finally:
+        REQUESTS_IN_FLIGHT.dec()
+    labels = ("GET", endpoint, str(response.status_code))
+    REQUESTS_TOTAL.inc(labels)
+    REQUEST_DURATION.observe(time.perf_counter() - started_at, labels)
+    return response
+
+
+@app.get("/books")
+async def get_books(request: Request):
+    return await _catalog_read(request, "books.get_books", books_listing)
+
+
+@app.get("/books/search")
+async def search_books(request: Request):
+    return await _catalog_read(request, "books.search_books", books_search)
+
+
+@app.get("/books/isbn/{isbn}")
+async def get_book_by_isbn(request: Request, isbn: str):
+    return await _catalog_read(request, "books.get_book_by_isbn", book_by_isbn, isbn)
+
+
+@app.get("/books/{book_id:int}")
+async def get_book_by_id(request: Request, book_id: int):
+    return await _catalog_read(request, "books.get_book_by_id", book_by_id, book_id)
+
+
+@app.get("/authors/{author_id:int}/books")
+async def get_author_books(request: Request, author_id: int):
+    return await _catalog_read(request, "authors.get_author_books", author_books, author_id)
+
+
+app.mount("/", WSGIMiddleware(flask_app))
@@ -1,28 +1,26 @@
-"""Authentication: password hashing, JWT, token_required decorator."""
+"""Authentication: JWT, token_required decorator (password hashing lives in app.hashing)."""
 import os
 import datetime
 from functools import wraps
 
 import jwt
 from flask import abort, request
-from passlib.context import CryptContext
+from sqlalchemy import event
 
+from app.cache import TTLCache
 from app.database import session_scope
 from app.models import Users
 
 SECRET_KEY = os.environ.get("SECRET_KEY")  # Set in .env (never commit)
 ALGORITHM = os.environ.get("JWT_ALGORITHM", "HS256")
 TOKEN_EXPIRY_HOURS = int(os.environ.get("TOKEN_EXPIRY_HOURS", "1"))
+USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", "10000"))
+# Deletes are only evicted in the process that made them; in every other process (prefork workers,
+# scripts/cleanup_after_loadtest.py) a deleted user's token keeps working until the entry expires.
+USER_CACHE_TTL_SECONDS = float(os.environ.get("USER_CACHE_TTL_SECONDS", "5"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-
-def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+# user_id -> True for users known to exist
+_user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL_SECONDS)
 
 
 def create_token(user_id: int) -> str:
@@ -33,22 +31,61 @@ def create_token(user_id: int) -> str:
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def get_current_user_from_request():
-    """Extract and validate JWT; return (user_id, None) or abort with 401."""
+def invalidate_user(user_id: int) -> None:
+    """Drop a user from the existence cache; call whenever a user row is deleted."""
+    _user_cache.delete(user_id)
+
+
+def clear_user_cache() -> None:
+    _user_cache.clear()
+
+
+def user_cache_stats() -> dict:
+    return _user_cache.stats()
+
+
+@event.listens_for(Users, "after_delete")
+def _invalidate_deleted_user(_mapper, _connection, target):
+    invalidate_user(target.id)
+
+
+def _user_exists(user_id: int) -> bool:
+    if _user_cache.get(user_id):
+        return True
+    with session_scope() as session:
+        exists = session.get(Users, user_id) is not None
+    if exists:
+        _user_cache.set(user_id, True)
+    return exists
+
+
+def bearer_token():
+    """The Bearer token of the current request, or None."""
     auth_header = request.headers.get("Authorization")
-    token = auth_header[7:] if auth_header and auth_header.startswith("Bearer ") else None
+    return auth_header[7:] if auth_header and auth_header.startswith("Bearer ") else None
+
 
+def user_id_from_token(token: str):
+    """user_id of a valid, unexpired token for an existing user; None otherwise (never aborts)."""
+    try:
+        user_id = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])["user_id"]
+    except (jwt.InvalidTokenError, KeyError):
+        return None
+    return user_id if _user_exists(user_id) else None
+
+
+def get_current_user_from_request():
+    """Extract and validate JWT; return (user_id, None) or abort with 401."""
+    token = bearer_token()
     if not token:
         abort(401, description="Token is missing")
 
     try:
         data = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id = data["user_id"]
-        with session_scope() as session:
-            user = session.query(Users).get(user_id)
-            if not user:
-                abort(401, description="User not found")
-            return user_id, None
+        if not _user_exists(user_id):
+            abort(401, description="User not found")
+        return user_id, None
     except jwt.ExpiredSignatureError:
         abort(401, description="Token expired")
     except jwt.InvalidTokenError:
@@ -0,0 +1,143 @@
+"""Response compression negotiated through Accept-Encoding.
+
+Responses of a compressible type are encoded with brotli (when the optional ``brotli`` package is installed)
+or gzip once they reach COMPRESSION_MIN_BYTES; streamed responses such as /books/export are compressed chunk by
+chunk. A compressed representation gets its own ETag (``"<etag>-gzip"``) so shared caches and If-None-Match
+never confuse it with the identity body. Cached read responses store their compressed bytes next to the plain
+ones (see app.response_cache), so a hot response is compressed once rather than on every request.
+"""
+import gzip
+import os
+import zlib
+
+from flask import Flask, Response, request
+
+from app.metrics import registry
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - exercised only without the optional dependency
+    brotli = None
+
+COMPRESSION_MIN_BYTES = int(os.environ.get("COMPRESSION_MIN_BYTES", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get("COMPRESSION_BROTLI_QUALITY", "5"))
+# Server preference order, used when the client accepts several encodings with the same quality.
+# An empty value disables compression.
+COMPRESSION_ENCODINGS = tuple(
+    name
+    for name in (n.strip() for n in os.environ.get("COMPRESSION_ENCODINGS", "br,gzip").split(","))
+    if name == "gzip" or (name == "br" and brotli is not None)
+)
+COMPRESSIBLE_MIMETYPES = {"application/json", "application/x-ndjson", "text/csv", "text/html", "text/plain"}
+# A streamed body is flushed to the client at least this often so exports keep making progress.
+_STREAM_FLUSH_BYTES = 64 * 1024
+
+COMPRESSED_TOTAL = registry.counter(
+    "http_responses_compressed_total", "Responses sent with a Content-Encoding.", ("encoding",)
+)
+
+
+def negotiate_encoding(size: int | None = None, accept_encodings=None):
+    """Best encoding the client accepts for a body of ``size`` bytes (None = streamed), or None for identity.
+
+    ``accept_encodings`` is a parsed werkzeug Accept header; it defaults to the current Flask request's.
+    """
+    if not COMPRESSION_ENCODINGS or (size is not None and size < COMPRESSION_MIN_BYTES):
+        return None
+    if accept_encodings is None:
+        accept_encodings = request.accept_encodings
+    return accept_encodings.best_match(COMPRESSION_ENCODINGS)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+    # mtime=0 keeps the output deterministic, so equal bodies compress to equal bytes
+    return gzip.compress(body, compresslevel=COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def compress_stream(chunks, encoding: str):
+    """Compress an iterable of str/bytes chunks incrementally, yielding compressed bytes as they become available."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+        process, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        process, finish = compressor.compress, compressor.flush
+
+        def flush():
+            return compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    pending = 0
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            out = process(chunk)
+            pending += len(chunk)
+            if pending >= _STREAM_FLUSH_BYTES:
+                out += flush()
+                pending = 0
+            if out:
+                yield out
+        yield finish()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    return f"{etag}-{encoding}"
+
+
+def matching_etag(etag: str, if_none_match=None):
+    """Return the variant of ``etag`` (identity or any encoding) listed in If-None-Match, or None.
+
+    ``if_none_match`` is a parsed werkzeug ETags; it defaults to the current Flask request's.
+    """
+    if if_none_match is None:
+        if_none_match = request.if_none_match
+    for candidate in (etag, *(encoded_etag(etag, e) for e in ("br", "gzip"))):
+        if if_none_match.contains(candidate):
+            return candidate
+    return None
+
+
+def mark_encoded(response: Response, encoding: str) -> None:
+    """Label an already-compressed response: Content-Encoding, Vary and the per-encoding ETag."""
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(encoded_etag(etag, encoding), weak)
+    COMPRESSED_TOTAL.inc((encoding,))
+
+
+def register_compression(app: Flask) -> None:
+    """Compress eligible responses that a view (or the response cache) has not already encoded."""
+
+    @app.after_request
+    def _compress_response(response):
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES or response.status_code != 200:
+            return response
+        response.vary.add("Accept-Encoding")
+        if "Content-Encoding" in response.headers or request.method == "HEAD":
+            return response
+
+        if response.is_streamed:
+            encoding = negotiate_encoding()
+            if encoding is not None:
+                response.response = compress_stream(response.response, encoding)
+                response.direct_passthrough = False
+                response.headers.pop("Content-Length", None)
+                mark_encoded(response, encoding)
+            return response
+
+        body = response.get_data()
+        encoding = negotiate_encoding(len(body))
+        if encoding is not None:
+            response.set_data(compress(body, encoding))
+            mark_encoded(response, encoding)
+        return response
@@ -0,0 +1,101 @@
+"""Conditional GET support: ETag / Last-Modified derived from the catalog version."""
+import os
+import threading
+import zlib
+from datetime import timezone
+from functools import wraps
+
+from flask import Response, g, make_response, request
+
+from app.cache import TTLCache
+from app.compression import matching_etag
+from app.database import session_scope
+from app.services import add_catalog_listener, get_catalog_version
+
+# How long a process reuses the catalog version it read instead of querying it on every GET. Commits made by
+# this process are seen at once; writes from other processes up to this much later. 0 reads it every time.
+CATALOG_VERSION_TTL_SECONDS = float(os.environ.get("CATALOG_VERSION_TTL_SECONDS", "1"))
+
+_version_cache = TTLCache(maxsize=1, ttl=CATALOG_VERSION_TTL_SECONDS)
+_version_lock = threading.Lock()
+# Bumped by every local commit; a version read that overlapped one is not cached.
+_version_generation = 0
+
+
+def _forget_catalog_version(_tags=None, _version=None) -> None:
+    global _version_generation  # pylint: disable=global-statement
+    with _version_lock:
+        _version_generation += 1
+        _version_cache.clear()
+
+
+add_catalog_listener(_forget_catalog_version)
+
+
+def clear_catalog_version_cache() -> None:
+    _forget_catalog_version()
+
+
+def current_catalog_version() -> tuple:
+    """(version, updated_at) as of at most CATALOG_VERSION_TTL_SECONDS ago, read in its own short transaction."""
+    cached = _version_cache.get("version")
+    if cached is not None:
+        return cached
+    generation = _version_generation
+    with session_scope() as session:
+        cached = get_catalog_version(session)
+    with _version_lock:
+        if generation == _version_generation:
+            _version_cache.set("version", cached)
+    return cached
+
+
+def catalog_etag(version: int, full_path: str | None = None) -> str:
+    """Strong ETag for a URL ("<path>?<query>", default the current request's) at a catalog version.
+
+    Quoted by werkzeug's set_etag. The async serving mode (app.asgi) passes the path itself, so both modes
+    hand out the same ETags.
+    """
+    if full_path is None:
+        full_path = request.full_path
+    return f"{version}-{zlib.crc32(full_path.encode('utf-8')):08x}"
+
+
+def not_modified_etag(etag: str, updated_at, if_none_match, if_modified_since):
+    """Return the ETag to send with a 304 (the variant the client holds), or None when the body must be sent."""
+    if if_none_match:
+        return matching_etag(etag, if_none_match)
+    if if_modified_since and updated_at is not None:
+        if updated_at.replace(tzinfo=timezone.utc, microsecond=0) <= if_modified_since:
+            return etag
+    return None
+
+
+def catalog_conditional(f):
+    """Answer If-None-Match / If-Modified-Since with 304 after a single (briefly cached) catalog-version lookup.
+
+    The version is read before the view runs, so a concurrent write can only make the ETag older than the
+    body (forcing a refetch next time), never newer.
+    """
+
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        version, updated_at = current_catalog_version()
+        etag = catalog_etag(version)
+        matched = not_modified_etag(etag, updated_at, request.if_none_match, request.if_modified_since)
+        if matched:
+            response = Response(status=304)
+            response.set_etag(matched)
+        else:
+            g.catalog_version, g.catalog_etag = version, etag
+            response = make_response(f(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        if "ETag" not in response.headers:
+            # A cached body keeps the ETag it was built under (see app.response_cache)
+            response.set_etag(etag)
+        if updated_at is not None:
+            response.last_modified = updated_at.replace(tzinfo=timezone.utc)
+        return response
+
+    return decorated
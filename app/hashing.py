@@ -0,0 +1,106 @@
+"""Password hashing offloaded to a bounded process pool.
+
+bcrypt is CPU-bound and holds the GIL, so running it on waitress's request threads lets a burst of
+register/login calls starve every other route. Work is sent to a small pool of worker processes instead;
+when too many hashes are already pending the call aborts with 503 rather than queueing indefinitely.
+
+This module is imported by the worker processes, so it must stay free of app/database imports.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from multiprocessing import get_context
+
+from flask import abort
+from passlib.context import CryptContext
+
+HASH_WORKERS = int(os.environ.get("AUTH_HASH_WORKERS", str(min(2, os.cpu_count() or 1))))
+# Same variable as app.database.SERVER_THREADS (not imported: see above). Capping pending hashes below the thread
+# count keeps at least one server thread free for other routes during a burst of logins.
+_SERVER_THREADS = int(os.environ.get("SERVER_THREADS", "4"))
+HASH_QUEUE_LIMIT = int(os.environ.get("AUTH_HASH_QUEUE_LIMIT", str(max(1, _SERVER_THREADS - 1))))
+HASH_TIMEOUT_SECONDS = float(os.environ.get("AUTH_HASH_TIMEOUT_SECONDS", "10"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(plain: str, hashed: str) -> bool:
+    return pwd_context.verify(plain, hashed)
+
+
+class HashingPool:
+    """Process pool with a cap on pending jobs. ``workers=0`` hashes inline on the calling thread."""
+
+    def __init__(self, workers: int, queue_limit: int, timeout: float):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # spawn: never fork the request threads or pooled DB connections into workers
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=get_context("spawn")
+                    )
+        return self._executor
+
+    def _release(self, _future=None) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def run(self, fn, *args):
+        """Run fn(*args) in the pool; abort(503) when the queue is full or the job times out."""
+        if self.workers <= 0:
+            return fn(*args)
+        with self._lock:
+            if self._pending >= self.queue_limit:
+                self.rejected += 1
+                abort(503, description="Authentication is busy, please retry shortly")
+            self._pending += 1
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            abort(503, description="Authentication timed out, please retry shortly")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "pending": self._pending,
+                "queue_limit": self.queue_limit,
+                "rejected": self.rejected,
+            }
+
+
+hashing_pool = HashingPool(HASH_WORKERS, HASH_QUEUE_LIMIT, HASH_TIMEOUT_SECONDS)
+
+
+def hash_password(password: str) -> str:
+    return hashing_pool.run(_hash, password)
+
+
+def verify_password(plain: str, hashed: str) -> bool:
+    return hashing_pool.run(_verify, plain, hashed)
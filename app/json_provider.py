@@ -0,0 +1,69 @@
+"""JSON encoding for API responses: orjson when installed, stdlib otherwise.
+
+Both providers emit ``datetime``/``date`` values as ISO 8601 strings, so serializers can hand them over as-is.
+"""
+import datetime
+import json
+import typing as t
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without the optional dependency
+    orjson = None
+
+
+def _default(o):
+    if isinstance(o, (datetime.datetime, datetime.date)):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """Flask's default provider, but with ISO 8601 instead of HTTP dates for datetimes."""
+
+    default = staticmethod(_default)
+    sort_keys = False
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Encodes with orjson straight to bytes; ``loads`` also goes through orjson."""
+
+    def dumps(self, obj: t.Any, **kwargs: t.Any) -> str:
+        default = kwargs.pop("default", _default)
+        if kwargs:
+            # indent/sort_keys style arguments: let the stdlib honour them
+            return super().dumps(obj, default=default, **kwargs)
+        return orjson.dumps(obj, default=default).decode("utf-8")
+
+    def dumpb(self, obj: t.Any) -> bytes:
+        return orjson.dumps(obj, default=_default)
+
+    def loads(self, s: str | bytes, **kwargs: t.Any) -> t.Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: t.Any, **kwargs: t.Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        if self._app.debug:
+            return super().response(obj)
+        return self._app.response_class(self.dumpb(obj), mimetype=self.mimetype)
+
+
+def json_provider_class():
+    return OrjsonProvider if orjson is not None else StdlibJSONProvider
+
+
+def configure_json(app: Flask) -> None:
+    """Install the fastest available JSON provider on the app."""
+    app.json = json_provider_class()(app)
+
+
+def dumpb(obj: t.Any) -> bytes:
+    """Encode obj to compact JSON bytes outside a request (exports, caches)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, default=_default, separators=(",", ":")).encode("utf-8")
@@ -1,54 +1,131 @@
-"""Application-wide logging and request logging."""
+"""Application-wide logging and request logging.
+
+Records are put on an in-memory queue by the request thread and formatted and written as one JSON object per line
+by a background thread (QueueHandler / QueueListener), so a slow stdout never stalls a request. Each request logs a
+single line on completion; successful ones can be sampled with LOG_REQUEST_SAMPLE_RATE, errors are always kept.
+"""
+import atexit
+import datetime
 import logging
+import os
+import queue
+import random
 import time
+from logging.handlers import QueueHandler, QueueListener
 from uuid import uuid4
 
 from flask import Flask, g, request
+from flask.logging import default_handler
 
+from app.json_provider import dumpb
+from app.metrics import registry
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+# Fraction of successful (< 400) requests logged; every line records the rate so counts can be re-weighted.
+LOG_REQUEST_SAMPLE_RATE = float(os.environ.get("LOG_REQUEST_SAMPLE_RATE", "1.0"))
+# Records waiting for the writer thread; beyond this they are dropped (and counted) instead of blocking requests.
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+
+LOG_RECORDS_DROPPED = registry.counter("log_records_dropped_total", "Log records dropped because the queue was full.")
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: timestamp, level, logger, message, plus the record's ``fields`` mapping."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return dumpb(entry).decode("utf-8")
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting is left to the writer thread; log arguments in this app are immutable values, so handing the
+        # record over as-is is safe.
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+_writer = logging.StreamHandler()
+_writer.setFormatter(JsonFormatter())
+_queue_handler = _NonBlockingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+_listener = None
 
-def configure_logging(app: Flask) -> None:
-    """Configure application-wide logging."""
-    if not app.logger.handlers:
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter(
-            "[%(asctime)s] %(levelname)s in %(module)s: %(message)s"
-        )
-        handler.setFormatter(formatter)
-        app.logger.addHandler(handler)
 
-    app.logger.setLevel(logging.INFO)
+def _start_listener() -> None:
+    global _listener  # pylint: disable=global-statement
+    _listener = QueueListener(_queue_handler.queue, _writer, respect_handler_level=True)
+    _listener.start()
+
+
+def _restart_listener_after_fork() -> None:
+    # The writer thread does not survive fork (e.g. app.prefork workers): give the child its own queue and thread.
+    if _listener is not None:
+        _queue_handler.queue = queue.Queue(LOG_QUEUE_SIZE)
+        _start_listener()
+
+
+def _stop_listener() -> None:
+    if _listener is not None and _listener._thread is not None:  # pylint: disable=protected-access
+        _listener.stop()  # flushes what is still queued
+
+
+os.register_at_fork(after_in_child=_restart_listener_after_fork)
+atexit.register(_stop_listener)
+
+
+def configure_logging(app: Flask) -> None:
+    """Route the ``app`` package loggers (the Flask app's, app.metrics, app.prefork...) to the JSON writer."""
+    if _listener is None:
+        _start_listener()
+    package_logger = logging.getLogger("app")
+    if _queue_handler not in package_logger.handlers:
+        package_logger.addHandler(_queue_handler)
+    package_logger.setLevel(LOG_LEVEL)
+    app.logger.removeHandler(default_handler)
 
 
 def register_request_logging(app: Flask) -> None:
-    """Add hooks to log every request and response."""
+    """Log one structured line per completed request (sampled for successes) and tag responses with X-Request-ID."""
 
     @app.before_request
     def _log_request():
         g.request_id = str(uuid4())
-        g.request_started_at = time.time()
-
-        app.logger.info(
-            "Incoming request id=%s method=%s path=%s remote_addr=%s user_agent=%s",
-            g.request_id,
-            request.method,
-            request.full_path.rstrip("?"),
-            request.remote_addr,
-            request.headers.get("User-Agent", "-"),
-        )
+        g.request_started_at = time.perf_counter()
 
     @app.after_request
     def _log_response(response):
-        started_at = getattr(g, "request_started_at", None)
-        duration_ms = (time.time() - started_at) * 1000 if started_at else None
-
-        app.logger.info(
-            "Completed request id=%s method=%s path=%s status=%s duration_ms=%s",
-            getattr(g, "request_id", "-"),
-            request.method,
-            request.full_path.rstrip("?"),
-            response.status_code,
-            f"{duration_ms:.2f}" if duration_ms is not None else "unknown",
-        )
-
         response.headers.setdefault("X-Request-ID", getattr(g, "request_id", "-"))
+        status = response.status_code
+        if status < 400 and LOG_REQUEST_SAMPLE_RATE < 1 and random.random() >= LOG_REQUEST_SAMPLE_RATE:
+            return response
+
+        started_at = g.get("request_started_at")
+        fields = {
+            "request_id": g.get("request_id", "-"),
+            "method": request.method,
+            "path": request.full_path.rstrip("?"),
+            "endpoint": request.endpoint,
+            "status": status,
+            "duration_ms": round((time.perf_counter() - started_at) * 1000, 2) if started_at else None,
+            "db_queries": g.get("db_queries", 0),
+            "db_ms": round(g.get("db_seconds", 0.0) * 1000, 2),
+            "remote_addr": request.remote_addr,
+            "user_agent": request.headers.get("User-Agent", "-"),
+        }
+        if status < 400:
+            fields["sample_rate"] = LOG_REQUEST_SAMPLE_RATE
+        app.logger.info("request completed", extra={"fields": fields})
         return response
@@ -5,15 +5,24 @@ load_dotenv()
 
 from flask import Flask
 
+from app.compression import register_compression
 from app.error_handlers import register_error_handlers
+from app.json_provider import configure_json
 from app.logging_config import configure_logging, register_request_logging
+from app.metrics import register_metrics
+from app.profiler import register_profiler
 from app.routers import register_blueprints
 
 
 def create_app() -> Flask:
     flask_app = Flask(__name__)
+    # First, so a profiled request covers every other hook
+    register_profiler(flask_app)
+    configure_json(flask_app)
     configure_logging(flask_app)
     register_request_logging(flask_app)
+    register_metrics(flask_app)
+    register_compression(flask_app)
     register_error_handlers(flask_app)
     register_blueprints(flask_app)
     return flask_app
@@ -0,0 +1,377 @@
+"""In-process metrics registry rendered in Prometheus text exposition format.
+
+Also owns the SQL instrumentation: every statement is counted and timed against the current request, which
+reports the totals in ``X-DB-Queries`` / ``Server-Timing`` headers and its log line, and statements slower than
+DB_SLOW_QUERY_MS are logged with the shape (names and types, never values) of their bound parameters.
+"""
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Flask, current_app, g, has_app_context, has_request_context, request
+from sqlalchemy import event
+
+from app.auth import user_cache_stats
+from app.database import engine, pool_stats
+from app.hashing import hashing_pool
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Statements taking at least this long are logged; 0 disables the slow-query log.
+DB_SLOW_QUERY_MS = float(os.environ.get("DB_SLOW_QUERY_MS", "200"))
+_SLOW_QUERY_MAX_CHARS = 2000
+
+logger = logging.getLogger(__name__)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, label_names: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _header(self) -> list:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> list:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = self._header()
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}")
+        return lines
+
+    def value(self, labels: tuple = ()):
+        with self._lock:
+            return self._values.get(labels, 0)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, labels: tuple = ()) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, labels: tuple = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: tuple = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: tuple = ()) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # [per-bucket counts (non-cumulative, last slot is +Inf), sum, count]
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def value(self, labels: tuple = ()):
+        """Return (count, sum) for one label set."""
+        with self._lock:
+            state = self._values.get(labels)
+            return (state[2], state[1]) if state else (0, 0.0)
+
+    def render(self) -> list:
+        with self._lock:
+            items = sorted((labels, ([*s[0]], s[1], s[2])) for labels, s in self._values.items())
+        lines = self._header()
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics plus collectors: callables returning [(name, kind, help, value)] at scrape time."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, label_names: tuple = ()) -> Counter:
+        return self._register(Counter(name, help_text, label_names))
+
+    def gauge(self, name: str, help_text: str, label_names: tuple = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, label_names))
+
+    def histogram(self, name: str, help_text: str, label_names: tuple = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, label_names, buckets))
+
+    def register_collector(self, collector) -> None:
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in collectors:
+            for name, kind, help_text, value in collector():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUESTS_TOTAL = registry.counter(
+    "http_requests_total", "HTTP requests handled.", ("method", "endpoint", "status")
+)
+REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("method", "endpoint", "status")
+)
+REQUESTS_IN_FLIGHT = registry.gauge("http_requests_in_flight", "HTTP requests currently being handled.")
+REQUEST_DB_QUERIES = registry.histogram(
+    "http_request_db_queries",
+    "SQL statements executed per HTTP request.",
+    ("endpoint",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+REQUEST_DB_SECONDS = registry.histogram(
+    "http_request_db_seconds", "Time spent executing SQL per HTTP request.", ("endpoint",)
+)
+DB_QUERIES_TOTAL = registry.counter("db_queries_total", "SQL statements executed.")
+DB_SLOW_QUERIES_TOTAL = registry.counter("db_slow_queries_total", "SQL statements slower than DB_SLOW_QUERY_MS.")
+
+
+def _pool_collector():
+    help_text = {
+        "size": "Configured pool size.",
+        "checked_out": "Connections currently checked out.",
+        "checked_in": "Idle connections in the pool.",
+        "overflow": "Overflow connections currently open.",
+        "max_overflow": "Maximum overflow connections.",
+        "overflow_peak": "Highest overflow seen since start.",
+        "checkouts": "Connection checkouts.",
+        "wait_seconds_total": "Total time spent waiting for a connection.",
+        "wait_seconds_max": "Longest wait for a connection.",
+        "timeouts": "Checkouts that timed out waiting for a connection.",
+    }
+    counters = {"checkouts", "wait_seconds_total", "timeouts"}
+    return [
+        (f"db_pool_{key}", "counter" if key in counters else "gauge", text, value)
+        for key, value in pool_stats().items()
+        if (text := help_text.get(key)) is not None
+    ]
+
+
+def _auth_collector():
+    cache = user_cache_stats()
+    hashing = hashing_pool.stats()
+    return [
+        ("auth_user_cache_hits_total", "counter", "token_required user cache hits.", cache["hits"]),
+        ("auth_user_cache_misses_total", "counter", "token_required user cache misses.", cache["misses"]),
+        ("auth_user_cache_size", "gauge", "Users currently cached.", cache["size"]),
+        ("auth_hash_pending", "gauge", "Password hashes queued or running.", hashing["pending"]),
+        ("auth_hash_rejected_total", "counter", "Hashes rejected with 503.", hashing["rejected"]),
+    ]
+
+
+def parameter_shape(parameters, executemany: bool = False) -> str:
+    """Describe bound parameters by name and type only, e.g. ``{id_1: int, title: str}`` or ``3 x (int, str)``."""
+    if executemany and isinstance(parameters, (list, tuple)) and parameters:
+        return f"{len(parameters)} x {parameter_shape(parameters[0])}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    DB_QUERIES_TOTAL.inc()
+    if has_request_context():
+        g.db_queries = g.get("db_queries", 0) + 1
+    context.books_api_query_started_at = time.perf_counter()
+
+
+def _time_query(conn, cursor, statement, parameters, context, executemany):
+    started_at = getattr(context, "books_api_query_started_at", None)
+    if started_at is None:
+        return
+    elapsed = time.perf_counter() - started_at
+    if has_request_context():
+        g.db_seconds = g.get("db_seconds", 0.0) + elapsed
+    if DB_SLOW_QUERY_MS > 0 and elapsed * 1000 >= DB_SLOW_QUERY_MS:
+        DB_SLOW_QUERIES_TOTAL.inc()
+        (current_app.logger if has_app_context() else logger).warning(
+            "Slow query id=%s duration_ms=%.2f statement=%s params=%s",
+            g.get("request_id", "-") if has_request_context() else "-",
+            elapsed * 1000,
+            " ".join(statement.split())[:_SLOW_QUERY_MAX_CHARS],
+            parameter_shape(parameters, executemany),
+        )
+
+
+def instrument_engine(target) -> None:
+    """Count and time every statement run through ``target`` (a sync Engine, or an AsyncEngine's sync_engine)."""
+    for name, listener in (("before_cursor_execute", _count_query), ("after_cursor_execute", _time_query)):
+        if not event.contains(target, name, listener):
+            event.listen(target, name, listener)
+
+
+def _server_timing(db_queries: int, db_seconds: float, total_seconds: float) -> str:
+    return f'db;dur={db_seconds * 1000:.2f};desc="{db_queries} queries", total;dur={total_seconds * 1000:.2f}'
+
+
+def register_metrics(app: Flask) -> None:
+    """Record per-request count, latency, in-flight and SQL statement metrics."""
+    instrument_engine(engine)
+    registry.register_collector(_pool_collector)
+    registry.register_collector(_auth_collector)
+
+    @app.before_request
+    def _start_metrics():
+        g.metrics_started_at = time.perf_counter()
+        g.db_queries = 0
+        g.db_seconds = 0.0
+        g.metrics_in_flight = True
+        REQUESTS_IN_FLIGHT.inc()
+
+    @app.after_request
+    def _record_metrics(response):
+        started_at = g.pop("metrics_started_at", None)
+        if started_at is not None:
+            elapsed = time.perf_counter() - started_at
+            endpoint = request.endpoint or "unmatched"
+            labels = (request.method, endpoint, str(response.status_code))
+            db_queries, db_seconds = g.get("db_queries", 0), g.get("db_seconds", 0.0)
+            REQUESTS_TOTAL.inc(labels)
+            REQUEST_DURATION.observe(elapsed, labels)
+            REQUEST_DB_QUERIES.observe(db_queries, (endpoint,))
+            REQUEST_DB_SECONDS.observe(db_seconds, (endpoint,))
+            # A streamed body (e.g. /books/export) runs its queries later, so its figures cover setup only
+            response.headers["X-DB-Queries"] = str(db_queries)
+            response.headers["Server-Timing"] = _server_timing(db_queries, db_seconds, elapsed)
+        return response
+
+    @app.teardown_request
+    def _finish_metrics(_exc):
+        if g.pop("metrics_in_flight", False):
+            REQUESTS_IN_FLIGHT.dec()
+
+
+# Set in prefork workers (see app.prefork): every worker publishes its own exposition to a shared directory
+# and a scrape, whichever worker answers it, merges all of them with a worker="<slot>" label.
+_worker_slot = None
+_worker_dir = None
+
+
+def _with_worker_label(sample: str, slot) -> str:
+    name_end = min(i for i in (sample.find("{"), sample.find(" ")) if i >= 0)
+    label = f'worker="{slot}"'
+    if sample[name_end] == "{":
+        return f"{sample[:name_end + 1]}{label},{sample[name_end + 1:]}"
+    return f"{sample[:name_end]}{{{label}}}{sample[name_end:]}"
+
+
+def merge_expositions(texts: dict) -> str:
+    """Merge {worker slot: exposition text} into one exposition, one family block per metric name."""
+    families = {}
+    for slot, text in sorted(texts.items()):
+        family = None
+        for line in text.splitlines():
+            if line.startswith("# HELP ") or line.startswith("# TYPE "):
+                name = line.split(" ", 3)[2]
+                family = families.setdefault(name, {"header": [], "samples": []})
+                if len(family["header"]) < 2 and line not in family["header"]:
+                    family["header"].append(line)
+            elif line and family is not None:
+                family["samples"].append(_with_worker_label(line, slot))
+    lines = []
+    for family in families.values():
+        lines.extend(family["header"])
+        lines.extend(family["samples"])
+    return "\n".join(lines) + "\n"
+
+
+def enable_worker_metrics(slot: int, directory: str) -> None:
+    """Publish this process's metrics as worker ``slot`` into ``directory`` (shared by all workers)."""
+    global _worker_slot, _worker_dir  # pylint: disable=global-statement
+    _worker_slot, _worker_dir = slot, directory
+
+
+def publish_worker_metrics() -> None:
+    if _worker_dir is None:
+        return
+    path = os.path.join(_worker_dir, f"worker-{_worker_slot}.prom")
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        f.write(registry.render())
+    os.replace(f"{path}.tmp", path)
+
+
+def render_metrics() -> str:
+    """This process's metrics, or every prefork worker's merged when running under app.prefork."""
+    if _worker_dir is None:
+        return registry.render()
+    publish_worker_metrics()
+    texts = {}
+    for filename in os.listdir(_worker_dir):
+        if filename.startswith("worker-") and filename.endswith(".prom"):
+            with open(os.path.join(_worker_dir, filename), encoding="utf-8") as f:
+                texts[int(filename[len("worker-"):-len(".prom")])] = f.read()
+    return merge_expositions(texts)
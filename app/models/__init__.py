@@ -1,7 +1,7 @@
 """ORM models."""
 from datetime import datetime
 
-from sqlalchemy import Table, Boolean, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import DDL, Table, BigInteger, Boolean, Column, DateTime, ForeignKey, Index, Integer, String, event
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
@@ -11,6 +11,8 @@ book_genre = Table(
     Base.metadata,
     Column("book_id", Integer, ForeignKey("books.id"), primary_key=True),
     Column("genre_id", Integer, ForeignKey("genres.id"), primary_key=True),
+    # The (book_id, genre_id) primary key serves book -> genres; this serves genre -> books in book id order.
+    Index("ix_book_genre_genre_id_book_id", "genre_id", "book_id"),
 )
 
 
@@ -27,11 +29,21 @@ class Author(Base):
 
 class Book(Base):
     __tablename__ = "books"
+    # Each GET /books filter/sort combination is served by one of these (app.schemas.validators.INDEXED_SORT_FILTERS);
+    # trailing id columns make the keyset (sort value, id) order come straight from the index.
+    __table_args__ = (
+        Index("ix_books_author_id_id", "author_id", "id"),
+        Index("ix_books_author_id_published_year_id", "author_id", "published_year", "id"),
+        Index("ix_books_created_by_id_id", "created_by_id", "id"),
+        Index("ix_books_published_year_id", "published_year", "id"),
+    )
 
     id = Column(Integer, primary_key=True)
     title = Column(String(255), nullable=False)
     author_id = Column(Integer, ForeignKey("authors.id"), nullable=False)
     isbn = Column(String(20), nullable=True)
+    # ISBN-13 form of isbn (see app.schemas.validators.normalize_isbn); the unique index makes lookups one probe
+    isbn13 = Column(String(13), nullable=True, unique=True, index=True)
     published_year = Column(Integer, nullable=True)
     created_at = Column(DateTime, nullable=True, default=datetime.utcnow)
     created_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -41,11 +53,53 @@ class Book(Base):
     genres = relationship("Genre", secondary=book_genre, back_populates="books")
 
 
+# Title search is maintained by the database, outside the ORM mapping (migration c4d8e2a6f0b3 installs the same
+# objects on existing databases): a trigger-fed tsvector column with a GIN index on PostgreSQL, and an
+# external-content FTS5 table kept in sync by triggers on SQLite.
+SEARCH_CONFIG = "english"
+SQLITE_SEARCH_TABLE = "books_fts"
+
+_POSTGRES_SEARCH_DDL = (
+    "ALTER TABLE books ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    f"""CREATE OR REPLACE FUNCTION books_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.title, ''));
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    """CREATE TRIGGER books_search_vector_trigger BEFORE INSERT OR UPDATE OF title ON books
+    FOR EACH ROW EXECUTE FUNCTION books_search_vector_update()""",
+    "CREATE INDEX IF NOT EXISTS ix_books_search_vector ON books USING GIN (search_vector)",
+)
+_SQLITE_SEARCH_DDL = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_SEARCH_TABLE}
+    USING fts5(title, content='books', content_rowid='id', tokenize='porter unicode61')""",
+    f"""CREATE TRIGGER IF NOT EXISTS books_fts_insert AFTER INSERT ON books BEGIN
+        INSERT INTO {SQLITE_SEARCH_TABLE}(rowid, title) VALUES (new.id, new.title);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS books_fts_delete AFTER DELETE ON books BEGIN
+        INSERT INTO {SQLITE_SEARCH_TABLE}({SQLITE_SEARCH_TABLE}, rowid, title) VALUES ('delete', old.id, old.title);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS books_fts_update AFTER UPDATE OF title ON books BEGIN
+        INSERT INTO {SQLITE_SEARCH_TABLE}({SQLITE_SEARCH_TABLE}, rowid, title) VALUES ('delete', old.id, old.title);
+        INSERT INTO {SQLITE_SEARCH_TABLE}(rowid, title) VALUES (new.id, new.title);
+    END""",
+)
+
+for _statement in _POSTGRES_SEARCH_DDL:
+    event.listen(Book.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+for _statement in _SQLITE_SEARCH_DDL:
+    event.listen(Book.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(
+    Book.__table__, "after_drop", DDL(f"DROP TABLE IF EXISTS {SQLITE_SEARCH_TABLE}").execute_if(dialect="sqlite")
+)
+
+
 class Genre(Base):
     __tablename__ = "genres"
 
     id = Column(Integer, primary_key=True)
-    name = Column(String(100), nullable=False)
+    name = Column(String(100), nullable=False, unique=True, index=True)
     books = relationship("Book", secondary=book_genre, back_populates="genres")
 
 
@@ -53,11 +107,21 @@ class Users(Base):
     __tablename__ = "users"
 
     id = Column(Integer, primary_key=True)
-    username = Column(String(100), nullable=False)
+    username = Column(String(100), nullable=False, unique=True, index=True)
     hashed_password = Column(String(255), nullable=False)
     books = relationship("Book", back_populates="created_by")
 
 
+class CatalogVersion(Base):
+    """Single row bumped by every catalog write; lets readers validate caches without scanning books."""
+
+    __tablename__ = "catalog_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
 class Task(Base):
     __tablename__ = "tasks"
 
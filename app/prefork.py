@@ -0,0 +1,202 @@
+"""Prefork server: N shared-nothing waitress worker processes accepting on one listening socket.
+
+The master imports the app once, binds the socket and forks SERVER_WORKERS workers (default: one per CPU), so
+bcrypt and JSON encoding are no longer confined to a single GIL. Each worker disposes the SQLAlchemy pool it
+inherited before serving, so no pooled connection is ever shared across processes, and publishes its metrics for
+the merged /metrics view (see app.metrics.render_metrics).
+
+Signals to the master:
+  SIGHUP           graceful reload: start a fresh generation of workers, then drain and retire the old one
+  SIGTERM / SIGINT graceful shutdown: workers stop accepting, finish in-flight requests, then exit
+
+Workers are forked from the preloaded app, so a reload renews processes and DB connections but not code; deploy
+code changes with a restart. A worker that dies is replaced in the same slot; when a slot keeps crashing soon
+after starting, its restarts are delayed exponentially (up to PREFORK_RESTART_BACKOFF_MAX) instead of re-forking
+in a tight loop.
+"""
+import logging
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import threading
+import time
+import _thread
+
+from waitress.server import create_server
+
+from app.database import engine
+from app.metrics import enable_worker_metrics, publish_worker_metrics
+
+SERVER_WORKERS = int(os.environ.get("SERVER_WORKERS", str(os.cpu_count() or 1)))
+SERVER_GRACEFUL_TIMEOUT = float(os.environ.get("SERVER_GRACEFUL_TIMEOUT", "30"))
+# How often each worker refreshes the metrics it publishes for the other workers' scrapes.
+PREFORK_METRICS_INTERVAL = float(os.environ.get("PREFORK_METRICS_INTERVAL", "5"))
+# Longest delay before re-forking a crashing slot; a worker that stayed up PREFORK_STABLE_UPTIME resets its backoff.
+PREFORK_RESTART_BACKOFF_MAX = float(os.environ.get("PREFORK_RESTART_BACKOFF_MAX", "30"))
+PREFORK_STABLE_UPTIME = float(os.environ.get("PREFORK_STABLE_UPTIME", "10"))
+
+logger = logging.getLogger(__name__)
+
+
+def after_fork_in_worker(slot: int, metrics_dir: str) -> None:
+    """Reset per-process state inherited from the master before a worker serves anything."""
+    # close=False leaves the master's sockets alone and just gives this process a fresh, empty pool
+    engine.dispose(close=False)
+    enable_worker_metrics(slot, metrics_dir)
+
+
+def _drained(server) -> bool:
+    dispatcher = server.task_dispatcher
+    if dispatcher.active_count or dispatcher.queue:
+        return False
+    return all(not ch.requests and not ch.total_outbufs_len for ch in list(server.active_channels.values()))
+
+
+def _serve_worker(app, sock: socket.socket, slot: int, metrics_dir: str, threads: int) -> None:
+    after_fork_in_worker(slot, metrics_dir)
+    server = create_server(app, sockets=[sock], threads=threads)
+    stopping = threading.Event()
+
+    def drain():
+        deadline = time.monotonic() + SERVER_GRACEFUL_TIMEOUT
+        while not _drained(server) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        _thread.interrupt_main()
+
+    def stop(_signum, _frame):
+        if not stopping.is_set():
+            stopping.set()
+            server.accepting = False  # readable() turns False: the shared socket is left to the other workers
+            # drain() ends the loop with interrupt_main(); a second Ctrl-C stops the worker straight away
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            threading.Thread(target=drain, daemon=True).start()
+
+    def publish():
+        while not stopping.wait(PREFORK_METRICS_INTERVAL):
+            publish_worker_metrics()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    threading.Thread(target=publish, daemon=True).start()
+    publish_worker_metrics()
+    server.run()
+    publish_worker_metrics()
+
+
+class PreforkServer:
+    """Master process: keeps ``workers`` slots filled and handles reload / shutdown signals."""
+
+    def __init__(self, app, host: str, port: int, workers: int = SERVER_WORKERS, threads: int = 4):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers)
+        self.threads = threads
+        self._slots = {}  # pid -> slot of the current generation
+        self._started_at = {}  # pid -> monotonic start time
+        self._retiring = set()  # pids of a previous generation still draining
+        self._crashes = {}  # slot -> consecutive early exits
+        self._restart_at = {}  # slot -> monotonic time before which it is not re-forked
+        self._reload = False
+        self._stopping = False
+
+    def _fork(self, sock, slot: int, metrics_dir: str) -> int:
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                _serve_worker(self.app, sock, slot, metrics_dir, self.threads)
+            except BaseException:  # pylint: disable=broad-exception-caught
+                logger.exception("Worker %s crashed", slot)
+                status = 1
+            finally:
+                # Never fall back into the master's loop or run its atexit handlers
+                os._exit(status)  # pylint: disable=protected-access
+        logger.info("Worker %s started pid=%s", slot, pid)
+        self._started_at[pid] = time.monotonic()
+        return pid
+
+    def _schedule_restart(self, slot: int, uptime: float) -> None:
+        """Replace the first early exit at once, then wait 1s, 2s, 4s... up to PREFORK_RESTART_BACKOFF_MAX."""
+        crashes = 1 if uptime >= PREFORK_STABLE_UPTIME else self._crashes.get(slot, 0) + 1
+        self._crashes[slot] = crashes
+        delay = 0.0 if crashes == 1 else min(PREFORK_RESTART_BACKOFF_MAX, 2.0 ** (crashes - 2))
+        if delay:
+            logger.warning("Worker %s exited %s times in a row, restarting it in %.0fs", slot, crashes, delay)
+        self._restart_at[slot] = time.monotonic() + delay
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            self._retiring.discard(pid)
+            slot = self._slots.pop(pid, None)
+            started_at = self._started_at.pop(pid, time.monotonic())
+            if slot is not None and not self._stopping:
+                logger.warning("Worker %s pid=%s exited with status %s", slot, pid, os.waitstatus_to_exitcode(status))
+                self._schedule_restart(slot, time.monotonic() - started_at)
+
+    def _terminate(self, pids) -> None:
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _wait_for_exit(self) -> None:
+        deadline = time.monotonic() + SERVER_GRACEFUL_TIMEOUT + 5
+        while self._retiring and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in self._retiring:
+            logger.warning("Worker pid=%s did not drain in time, killing it", pid)
+            os.kill(pid, signal.SIGKILL)
+        self._reap()
+
+    def run(self) -> None:
+        sock = socket.create_server((self.host, self.port), backlog=2048)
+        metrics_dir = tempfile.mkdtemp(prefix="books-api-metrics-")
+
+        def on_stop(_signum, _frame):
+            self._stopping = True
+
+        def on_reload(_signum, _frame):
+            self._reload = True
+
+        signal.signal(signal.SIGTERM, on_stop)
+        signal.signal(signal.SIGINT, on_stop)
+        signal.signal(signal.SIGHUP, on_reload)
+        logger.info("Serving on %s:%s with %s workers", self.host, self.port, self.workers)
+        try:
+            while not self._stopping:
+                self._reap()
+                if self._reload:
+                    self._reload = False
+                    logger.info("Reloading %s workers", len(self._slots))
+                    self._retiring.update(self._slots)
+                    old, self._slots = list(self._slots), {}
+                    self._fill_slots(sock, metrics_dir)
+                    self._terminate(old)
+                self._fill_slots(sock, metrics_dir)
+                time.sleep(0.2)
+            self._retiring.update(self._slots)
+            self._slots.clear()
+            self._terminate(self._retiring)
+            self._wait_for_exit()
+        finally:
+            sock.close()
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+    def _fill_slots(self, sock, metrics_dir: str) -> None:
+        taken = set(self._slots.values())
+        now = time.monotonic()
+        for slot in range(self.workers):
+            if slot not in taken and not self._stopping and self._restart_at.get(slot, 0) <= now:
+                self._slots[self._fork(sock, slot, metrics_dir)] = slot
@@ -0,0 +1,108 @@
+"""Opt-in sampling profiler for single requests, for finding where a slow route spends its Python time.
+
+Nothing is registered unless PROFILER_ENABLED is set, so a normal deployment pays nothing. When enabled, a request
+is profiled only if it asks to be (``X-Profile: 1`` header or ``?_profile=1``), carries a Bearer token of a user
+listed in PROFILER_ADMIN_USER_IDS, and wins the PROFILER_SAMPLE_RATE draw; any other request just skips the hooks.
+
+A background thread samples the request thread's stack every PROFILER_INTERVAL_MS and the result is folded into
+collapsed stacks ("outer;inner;leaf count" lines, ready for flamegraph.pl or speedscope). With PROFILER_OUTPUT_DIR
+set the profile is written to ``<dir>/<request id>.collapsed`` and named in the ``X-Profile-Id`` header of the normal
+response; otherwise the response body is replaced by the profile, with the route's own status in ``X-Profiled-Status``.
+"""
+import os
+import random
+import sys
+import threading
+from collections import Counter
+
+from flask import Flask, Response, g, request
+
+from app.auth import bearer_token, user_id_from_token
+
+PROFILER_ENABLED = os.environ.get("PROFILER_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILER_ADMIN_USER_IDS = frozenset(
+    int(user_id) for user_id in os.environ.get("PROFILER_ADMIN_USER_IDS", "").split(",") if user_id.strip()
+)
+PROFILER_SAMPLE_RATE = float(os.environ.get("PROFILER_SAMPLE_RATE", "1.0"))
+PROFILER_INTERVAL_MS = float(os.environ.get("PROFILER_INTERVAL_MS", "1"))
+PROFILER_OUTPUT_DIR = os.environ.get("PROFILER_OUTPUT_DIR")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Counts the distinct Python stacks of one thread, sampled from a daemon thread every ``interval`` seconds."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)  # pylint: disable=protected-access
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> str:
+        """Stop sampling and return the collapsed stacks, hottest first."""
+        self._stop.set()
+        self._thread.join()
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _wants_profile() -> bool:
+    if request.headers.get("X-Profile") != "1" and request.args.get("_profile") != "1":
+        return False
+    token = bearer_token()
+    if not token or user_id_from_token(token) not in PROFILER_ADMIN_USER_IDS:
+        return False
+    return random.random() < PROFILER_SAMPLE_RATE
+
+
+def register_profiler(app: Flask) -> None:
+    """Install the profiling hooks when PROFILER_ENABLED; register it first so it spans every other hook."""
+    if not PROFILER_ENABLED:
+        return
+
+    @app.before_request
+    def _start_profile():
+        if _wants_profile():
+            g.profiler = StackSampler(threading.get_ident(), PROFILER_INTERVAL_MS / 1000)
+            g.profiler.start()
+
+    @app.after_request
+    def _finish_profile(response):
+        sampler = g.pop("profiler", None)
+        if sampler is None:
+            return response
+        collapsed = sampler.stop()
+        if PROFILER_OUTPUT_DIR:
+            profile_id = g.get("request_id") or f"{os.getpid()}-{threading.get_ident()}"
+            os.makedirs(PROFILER_OUTPUT_DIR, exist_ok=True)
+            with open(os.path.join(PROFILER_OUTPUT_DIR, f"{profile_id}.collapsed"), "w", encoding="utf-8") as f:
+                f.write(collapsed)
+            response.headers["X-Profile-Id"] = profile_id
+            return response
+        profiled = Response(collapsed, mimetype="text/plain")
+        profiled.headers["X-Profiled-Status"] = str(response.status_code)
+        profiled.headers["X-Profile-Samples"] = str(sum(sampler.stacks.values()))
+        return profiled
+
+    @app.teardown_request
+    def _discard_profile(_exc):
+        sampler = g.pop("profiler", None)
+        if sampler is not None:
+            sampler.stop()
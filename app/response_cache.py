@@ -0,0 +1,287 @@
+"""Response cache for read endpoints, invalidated by tag when the catalog changes.
+
+Entries hold the already-encoded response body, keyed on method, path and normalised query string, and carry
+tags such as "books", "book:<id>" or "author:<id>". Service writes announce the tags they touched (see
+app.services.catalog_version) and every matching entry is dropped once the transaction commits.
+
+The default backend is an in-process LRU bounded by entry count, entry size and TTL. Set RESPONSE_CACHE_URL
+to a redis:// URL (requires the optional ``redis`` package, see requirements-redis.txt) to share one cache
+between server processes; shared entries are keyed on the catalog version they were computed at.
+
+An entry also keeps the compressed forms of its body (see app.compression), added the first time a client
+asks for each encoding, so a hot response is compressed once per encoding instead of once per request.
+"""
+import os
+import threading
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import Response, g, make_response, request
+
+from app.cache import TTLCache
+from app.compression import compress, mark_encoded, matching_etag, negotiate_encoding
+from app.metrics import registry
+from app.services import add_catalog_listener
+
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", "1024"))
+RESPONSE_CACHE_TTL_SECONDS = float(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", "30"))
+RESPONSE_CACHE_MAX_ENTRY_BYTES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRY_BYTES", str(1024 * 1024)))
+RESPONSE_CACHE_URL = os.environ.get("RESPONSE_CACHE_URL")
+
+
+class CachedResponse:
+    __slots__ = ("body", "mimetype", "etag", "tags", "encoded")
+
+    def __init__(self, body: bytes, mimetype: str, etag, tags: tuple, encoded: dict | None = None):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = etag
+        self.tags = tags
+        # encoding -> compressed body, filled lazily by cached_response
+        self.encoded = encoded if encoded is not None else {}
+
+    def to_response(self, encoding=None) -> Response:
+        body = self.encoded[encoding] if encoding else self.body
+        response = Response(body, status=200, mimetype=self.mimetype)
+        if self.etag:
+            response.set_etag(self.etag)
+        if encoding:
+            mark_encoded(response, encoding)
+        return response
+
+
+class LocalBackend:
+    """In-process LRU + TTL store; invalidation scans the (bounded) entries for matching tags."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def set(self, key, entry: CachedResponse) -> None:
+        self._entries.set(key, entry)
+
+    def add_encoding(self, _key, entry: CachedResponse, encoding: str, body: bytes) -> None:
+        entry.encoded[encoding] = body
+
+    def invalidate(self, tags) -> None:
+        tags = set(tags)
+        self._entries.delete_where(lambda entry: not tags.isdisjoint(entry.tags))
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return self._entries.stats()
+
+
+class RedisBackend:
+    """Shared store: entries as hashes with a TTL, tags as Redis sets of keys."""
+
+    def __init__(self, url: str, ttl: float):
+        import redis  # pylint: disable=import-outside-toplevel
+
+        self._redis = redis.Redis.from_url(url)
+        self._ttl = max(1, int(ttl))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        data = self._redis.hgetall(f"rc:{key}")
+        with self._lock:
+            # add_encoding may recreate a hash that expired in between; without a body it is a miss
+            if b"body" not in data:
+                self.misses += 1
+                return None
+            self.hits += 1
+        etag = data.get(b"etag", b"").decode() or None
+        encoded = {
+            field[len(b"body:"):].decode(): value for field, value in data.items() if field.startswith(b"body:")
+        }
+        return CachedResponse(data[b"body"], data[b"mimetype"].decode(), etag, (), encoded)
+
+    def set(self, key, entry: CachedResponse) -> None:
+        pipe = self._redis.pipeline()
+        pipe.hset(f"rc:{key}", mapping={"body": entry.body, "mimetype": entry.mimetype, "etag": entry.etag or ""})
+        pipe.expire(f"rc:{key}", self._ttl)
+        for tag in entry.tags:
+            pipe.sadd(f"rc-tag:{tag}", key)
+            pipe.expire(f"rc-tag:{tag}", self._ttl)
+        pipe.execute()
+
+    def add_encoding(self, key, entry: CachedResponse, encoding: str, body: bytes) -> None:
+        entry.encoded[encoding] = body
+        pipe = self._redis.pipeline()
+        pipe.hset(f"rc:{key}", f"body:{encoding}", body)
+        pipe.expire(f"rc:{key}", self._ttl)
+        pipe.execute()
+
+    def invalidate(self, tags) -> None:
+        for tag in tags:
+            keys = self._redis.smembers(f"rc-tag:{tag}")
+            pipe = self._redis.pipeline()
+            for key in keys:
+                pipe.delete(f"rc:{key.decode()}")
+            pipe.delete(f"rc-tag:{tag}")
+            pipe.execute()
+
+    def clear(self) -> None:
+        for pattern in ("rc:*", "rc-tag:*"):
+            for key in self._redis.scan_iter(pattern):
+                self._redis.delete(key)
+
+    def stats(self) -> dict:
+        size = sum(1 for _ in self._redis.scan_iter("rc:*", count=1000))
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": 0, "size": size}
+
+
+class ResponseCache:
+    """Front for a backend that keeps a process-local cache coherent with writes made elsewhere.
+
+    Local commits invalidate precisely by tag. Every catalog version is consumed by exactly one commit, so
+    when the version read by a request (or announced by a local commit) skips past the last one this
+    process has accounted for, some other process wrote, and a local backend is cleared wholesale.
+
+    A shared backend cannot rely on this process's generation counter: a reader here may store a body computed
+    before another process's write landed. Its keys therefore include the catalog version (see key_for), so an
+    entry is only ever served to requests that observed the same version.
+    """
+
+    def __init__(self, backend, shared: bool = False):
+        self.backend = backend
+        self.shared = shared
+        self._known_version = None
+        # Bumped on every invalidation; a response computed across an invalidation is not stored,
+        # so a reader racing a writer can never re-insert the stale body.
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def invalidate(self, tags, version=None) -> None:
+        clear_all = False
+        with self._lock:
+            self._generation += 1
+            if version is not None and not self.shared:
+                known = self._known_version
+                clear_all = known is not None and version > known + 1
+                if known is None or version > known:
+                    self._known_version = version
+        if clear_all:
+            self.backend.clear()
+        else:
+            self.backend.invalidate(tags)
+
+    def sync(self, version: int) -> None:
+        """Called with the catalog version a request observed; clears a local backend after foreign writes."""
+        if self.shared:
+            return
+        with self._lock:
+            known = self._known_version
+            if known is not None and version <= known:
+                return
+            self._known_version = version
+            self._generation += 1
+        if known is not None:
+            self.backend.clear()
+
+    def key_for(self, key: str, version: int | None) -> str:
+        return f"{key}@{version}" if self.shared else key
+
+    def store(self, key, entry: CachedResponse, generation: int) -> bool:
+        with self._lock:
+            if generation != self._generation:
+                return False
+        self.backend.set(key, entry)
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._known_version = None
+        self.backend.clear()
+
+
+def _make_cache() -> ResponseCache:
+    if RESPONSE_CACHE_URL:
+        return ResponseCache(RedisBackend(RESPONSE_CACHE_URL, RESPONSE_CACHE_TTL_SECONDS), shared=True)
+    return ResponseCache(LocalBackend(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL_SECONDS))
+
+
+response_cache = _make_cache()
+add_catalog_listener(response_cache.invalidate)
+
+
+def cache_key() -> str:
+    """Method, path and query string with parameters sorted, so ?a=1&b=2 and ?b=2&a=1 share an entry."""
+    query = urlencode(sorted(request.args.items(multi=True)))
+    return f"{request.method}:{request.path}?{query}"
+
+
+def _entry_response(key, entry: CachedResponse) -> Response:
+    """Serve an entry in the encoding the client prefers, compressing (and remembering) it on first use."""
+    encoding = negotiate_encoding(len(entry.body))
+    if encoding is not None and encoding not in entry.encoded:
+        response_cache.backend.add_encoding(key, entry, encoding, compress(entry.body, encoding))
+    return entry.to_response(encoding)
+
+
+def cached_response(*tag_templates: str):
+    """Cache 200 responses of a GET view; tags are formatted with the view kwargs, e.g. "book:{book_id}"."""
+
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if RESPONSE_CACHE_SIZE <= 0 and not RESPONSE_CACHE_URL:
+                return f(*args, **kwargs)
+            if "catalog_version" in g:
+                response_cache.sync(g.catalog_version)
+            key = response_cache.key_for(cache_key(), g.get("catalog_version"))
+            entry = response_cache.backend.get(key)
+            if entry is not None:
+                matched = entry.etag and matching_etag(entry.etag)
+                if matched:
+                    response = Response(status=304)
+                    response.set_etag(matched)
+                    return response
+                return _entry_response(key, entry)
+
+            generation = response_cache.generation
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                body = response.get_data()
+                if len(body) <= RESPONSE_CACHE_MAX_ENTRY_BYTES:
+                    tags = tuple(t.format(**kwargs) for t in tag_templates)
+                    entry = CachedResponse(body, response.mimetype, g.get("catalog_etag"), tags)
+                    if response_cache.store(key, entry, generation):
+                        return _entry_response(key, entry)
+            return response
+
+        return decorated
+
+    return decorator
+
+
+def _cache_collector():
+    stats = response_cache.backend.stats()
+    lookups = stats["hits"] + stats["misses"]
+    return [
+        ("response_cache_hits_total", "counter", "Response cache hits.", stats["hits"]),
+        ("response_cache_misses_total", "counter", "Response cache misses.", stats["misses"]),
+        ("response_cache_evictions_total", "counter", "Entries evicted by the LRU bound.", stats["evictions"]),
+        ("response_cache_entries", "gauge", "Entries currently cached.", stats["size"]),
+        (
+            "response_cache_hit_ratio",
+            "gauge",
+            "Hits / lookups since start.",
+            stats["hits"] / lookups if lookups else 0.0,
+        ),
+    ]
+
+
+registry.register_collector(_cache_collector)
@@ -3,6 +3,7 @@ from app.routers.books import books_bp
 from app.routers.authors import authors_bp
 from app.routers.auth_routes import auth_bp
 from app.routers.docs import docs_bp
+from app.routers.metrics import metrics_bp
 
 
 def register_blueprints(app):
@@ -10,3 +11,4 @@ def register_blueprints(app):
     app.register_blueprint(authors_bp)
     app.register_blueprint(auth_bp)
     app.register_blueprint(docs_bp)
+    app.register_blueprint(metrics_bp)
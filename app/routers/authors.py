@@ -3,7 +3,16 @@ from flask import Blueprint, abort, jsonify, request
 
 from app.database import session_scope
 from app.auth import token_required
-from app.schemas import validate_author_create, book_to_dict, author_to_dict
+from app.conditional import catalog_conditional
+from app.response_cache import cached_response
+from app.singleflight import coalesce_requests
+from app.schemas import (
+    validate_author_create,
+    parse_fields_query,
+    parse_author_fields_query,
+    book_to_dict,
+    author_to_dict,
+)
 from app.services import AuthorService
 
 authors_bp = Blueprint("authors", __name__)
@@ -28,17 +37,31 @@ def add_author(_current_user_id):
 
 
 @authors_bp.route("/authors/<int:author_id>/books", methods=["GET"])
+@catalog_conditional
+@cached_response("author:{author_id}")
+@coalesce_requests
 def get_author_books(author_id):
     with session_scope() as session:
-        author = AuthorService(session).get_with_books(author_id)
-        if author is None:
-            abort(404, description="Author not found")
-        books_data = [book_to_dict(b) for b in author.books]
-        if not books_data:
-            abort(404, description="No books found for author")
-        payload = {
-            "status": "success",
-            "author": author_to_dict(author),
-            "books": books_data,
-        }
-    return jsonify(payload), 200
+        return jsonify(author_books(session, author_id, request.args)), 200
+
+
+def author_books(session, author_id, args):
+    """Payload of GET /authors/<id>/books; also served by the async mode (app.asgi)."""
+    ok, err, fields = parse_fields_query(args.get("fields"))
+    if not ok:
+        abort(400, description=err)
+    ok, err, author_fields = parse_author_fields_query(args.get("author_fields"))
+    if not ok:
+        abort(400, description=err)
+
+    author = AuthorService(session).get_with_books(author_id, fields, author_fields)
+    if author is None:
+        abort(404, description="Author not found")
+    books_data = [book_to_dict(b, fields) for b in author.books]
+    if not books_data:
+        abort(404, description="No books found for author")
+    return {
+        "status": "success",
+        "author": author_to_dict(author, author_fields),
+        "books": books_data,
+    }
@@ -1,19 +1,59 @@
 """Books API routes."""
-from flask import Blueprint, abort, jsonify, request
+import csv
+import io
+import os
+
+from flask import Blueprint, Response, abort, current_app, jsonify, request, stream_with_context
 
 from app.database import session_scope
 from app.auth import token_required
+from app.conditional import catalog_conditional
+from app.json_provider import dumpb
+from app.response_cache import cached_response
+from app.singleflight import coalesce_requests
 from app.models import Users
 from app.schemas import (
     validate_book_create,
     validate_book_update,
     parse_author_id_query,
+    parse_book_filters_query,
+    parse_pagination_query,
+    parse_export_format,
+    parse_search_query,
+    parse_fields_query,
+    normalize_isbn,
+    BOOK_CSV_COLUMNS,
     book_to_dict,
+    book_row_to_dict,
+    book_row_to_csv_row,
+    encode_cursor,
 )
 from app.services import BookService
 
 books_bp = Blueprint("books", __name__)
 
+BULK_CHUNK_SIZE = int(os.environ.get("BOOKS_BULK_CHUNK_SIZE", "1000"))
+EXPORT_BATCH_SIZE = int(os.environ.get("BOOKS_EXPORT_BATCH_SIZE", "1000"))
+_INVALID_JSON = object()
+
+
+def _iter_bulk_items():
+    """Yield raw items from a JSON array body or, line by line, from an NDJSON stream."""
+    if request.mimetype in ("application/x-ndjson", "application/jsonl"):
+        for line in request.stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield current_app.json.loads(line)
+            except ValueError:
+                yield _INVALID_JSON
+        return
+    data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        abort(400, description="Request body must be a JSON array or NDJSON stream of books")
+    yield from data
+
 
 @books_bp.route("/")
 def home():
@@ -39,26 +79,211 @@ def add_book(current_user_id):
     )
 
 
+@books_bp.route("/books/bulk", methods=["POST"])
+@token_required
+def add_books_bulk(current_user_id):
+    results = []
+    pending = []
+
+    def flush(service):
+        errors = service.bulk_create([payload for _, payload in pending], current_user_id)
+        for (index, payload), err in zip(pending, errors):
+            results[index] = _bulk_result(index, payload["id"], err)
+        pending.clear()
+
+    with session_scope() as session:
+        service = BookService(session)
+        for index, item in enumerate(_iter_bulk_items()):
+            results.append(None)
+            if item is _INVALID_JSON:
+                results[index] = _bulk_result(index, None, "Invalid JSON")
+                continue
+            if not isinstance(item, dict):
+                results[index] = _bulk_result(index, None, "Each item must be a JSON object")
+                continue
+            ok, err, payload = validate_book_create(item)
+            if not ok:
+                results[index] = _bulk_result(index, item.get("id"), err)
+                continue
+            pending.append((index, payload))
+            if len(pending) >= BULK_CHUNK_SIZE:
+                flush(service)
+        if pending:
+            flush(service)
+
+    created = sum(1 for r in results if r["status"] == "created")
+    return (
+        jsonify(
+            {
+                "status": "success",
+                "created": created,
+                "failed": len(results) - created,
+                "results": results,
+            }
+        ),
+        200,
+    )
+
+
+def _bulk_result(index: int, book_id, err) -> dict:
+    if err:
+        return {"index": index, "id": book_id, "status": "error", "error": err}
+    return {"index": index, "id": book_id, "status": "created"}
+
+
+# Read views build their payload from (session, query args) so the async serving mode (app.asgi) runs the
+# same validation and queries, through AsyncSession.run_sync, without a Flask request.
+
+
+def books_listing(session, args):
+    """Payload of GET /books."""
+    ok, err, query = parse_book_filters_query(args)
+    if not ok:
+        abort(400, description=err)
+    ok, err, page = parse_pagination_query(args.get("limit"), args.get("after"), args.get("paginate"), query["sort"])
+    if not ok:
+        abort(400, description=err)
+    ok, err, fields = parse_fields_query(args.get("fields"))
+    if not ok:
+        abort(400, description=err)
+
+    service = BookService(session)
+    if not page["paginate"]:
+        rows = service.list_rows(query["filters"], query["sort"], fields=fields)
+        return [book_row_to_dict(row, fields) for row in rows]
+    rows, next_key = service.list_page_rows(
+        page["limit"], page["after_key"], query["filters"], query["sort"], fields=fields
+    )
+    return {
+        "status": "success",
+        "books": [book_row_to_dict(row, fields) for row in rows],
+        "limit": page["limit"],
+        "next_cursor": encode_cursor(*next_key) if next_key is not None else None,
+    }
+
+
+def books_search(session, args):
+    """Payload of GET /books/search."""
+    ok, err, search = parse_search_query(args.get("q"), args.get("limit"), args.get("after"))
+    if not ok:
+        abort(400, description=err)
+    ok, err, author_id = parse_author_id_query(args.get("author_id"))
+    if not ok:
+        abort(400, description=err)
+    ok, err, fields = parse_fields_query(args.get("fields"))
+    if not ok:
+        abort(400, description=err)
+
+    rows, next_key = BookService(session).search_rows(
+        search["q"], search["limit"], search["after"], author_id=author_id, fields=fields
+    )
+    return {
+        "status": "success",
+        "books": [book_row_to_dict(row, fields) for row in rows],
+        "limit": search["limit"],
+        "next_cursor": encode_cursor(*next_key) if next_key is not None else None,
+    }
+
+
+def book_by_isbn(session, isbn, args):
+    """Payload of GET /books/isbn/<isbn>."""
+    isbn13 = normalize_isbn(isbn)
+    if isbn13 is None:
+        abort(400, description="ISBN must be a valid ISBN-10 or ISBN-13")
+    ok, err, fields = parse_fields_query(args.get("fields"))
+    if not ok:
+        abort(400, description=err)
+
+    row = BookService(session).get_by_isbn(isbn13, fields=fields)
+    if row is None:
+        abort(404, description="Book not found")
+    return {"status": "success", **book_row_to_dict(row, fields)}
+
+
+def book_by_id(session, book_id, args):
+    """Payload of GET /books/<id>."""
+    ok, err, fields = parse_fields_query(args.get("fields"))
+    if not ok:
+        abort(400, description=err)
+
+    book = BookService(session).get_by_id(book_id, fields=fields)
+    if book is None:
+        abort(404, description="Book not found")
+    return {"status": "success", **book_to_dict(book, fields)}
+
+
 @books_bp.route("/books", methods=["GET"])
+@catalog_conditional
+@cached_response("books")
+@coalesce_requests
 def get_books():
+    with session_scope() as session:
+        return jsonify(books_listing(session, request.args))
+
+
+@books_bp.route("/books/search", methods=["GET"])
+@catalog_conditional
+@cached_response("books")
+@coalesce_requests
+def search_books():
+    with session_scope() as session:
+        return jsonify(books_search(session, request.args))
+
+
+@books_bp.route("/books/export", methods=["GET"])
+def export_books():
     ok, err, author_id = parse_author_id_query(request.args.get("author_id"))
     if not ok:
         abort(400, description=err)
+    ok, err, fmt = parse_export_format(request.args.get("format"))
+    if not ok:
+        abort(400, description=err)
+
+    if fmt == "csv":
+        body, mimetype = _export_csv(author_id), "text/csv"
+    else:
+        body, mimetype = _export_ndjson(author_id), "application/x-ndjson"
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f"attachment; filename=books.{fmt}"
+    return response
 
+
+def _export_ndjson(author_id):
+    with session_scope() as session:
+        for row in BookService(session).iter_rows(author_id=author_id, batch_size=EXPORT_BATCH_SIZE):
+            yield dumpb(book_row_to_dict(row)) + b"\n"
+
+
+def _export_csv(author_id):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(BOOK_CSV_COLUMNS)
     with session_scope() as session:
-        books = BookService(session).list_all(author_id=author_id)
-        data = [book_to_dict(b) for b in books]
-    return jsonify(data)
+        for row in BookService(session).iter_rows(author_id=author_id, batch_size=EXPORT_BATCH_SIZE):
+            writer.writerow(book_row_to_csv_row(row))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
 
 
 @books_bp.route("/books/<int:book_id>", methods=["GET"])
+@catalog_conditional
+@cached_response("book:{book_id}")
+@coalesce_requests
 def get_book_by_id(book_id):
     with session_scope() as session:
-        book = BookService(session).get_by_id(book_id)
-        if book is None:
-            abort(404, description="Book not found")
-        data = book_to_dict(book)
-    return jsonify({"status": "success", **data}), 200
+        return jsonify(book_by_id(session, book_id, request.args)), 200
+
+
+@books_bp.route("/books/isbn/<isbn>", methods=["GET"])
+@catalog_conditional
+@cached_response("books")
+@coalesce_requests
+def get_book_by_isbn(isbn):
+    with session_scope() as session:
+        return jsonify(book_by_isbn(session, isbn, request.args)), 200
 
 
 @books_bp.route("/books/<int:book_id>", methods=["PUT"])
@@ -73,7 +298,7 @@ def update_book_by_id(_current_user_id, book_id):
     if err:
         if err == "Book not found":
             abort(404, description=err)
-        abort(400, description=err)
+        abort(409 if "already exists" in err else 400, description=err)
 
     return (
         jsonify({"status": "success", "message": f"Book with id {book_id} updated successfully!"}),
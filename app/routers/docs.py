@@ -16,7 +16,7 @@ OPENAPI_SPEC = {
         "/books": {
             "get": {
                 "summary": "List books",
-                "description": "Retrieve all books, optionally filtered by author.",
+                "description": "Retrieve a page of books, optionally filtered and sorted.",
                 "parameters": [
                     {
                         "name": "author_id",
@@ -24,17 +24,85 @@ OPENAPI_SPEC = {
                         "required": False,
                         "schema": {"type": "integer"},
                         "description": "Filter by author id",
-                    }
+                    },
+                    {
+                        "name": "limit",
+                        "in": "query",
+                        "required": False,
+                        "schema": {"type": "integer", "minimum": 1},
+                        "description": "Page size (capped by the server maximum)",
+                    },
+                    {
+                        "name": "after",
+                        "in": "query",
+                        "required": False,
+                        "schema": {"type": "string"},
+                        "description": "Cursor returned as next_cursor by the previous page",
+                    },
+                    {
+                        "name": "paginate",
+                        "in": "query",
+                        "required": False,
+                        "schema": {"type": "boolean"},
+                        "description": "Set to false to receive the legacy unpaginated array",
+                    },
+                    {
+                        "name": "created_by_id",
+                        "in": "query",
+                        "required": False,
+                        "schema": {"type": "integer"},
+                        "description": "Filter by the id of the user who created the book",
+                    },
+                    {
+                        "name": "genre",
+                        "in": "query",
+                        "required": False,
+                        "schema": {"type": "string"},
+                        "description": "Filter by genre name",
+                    },
+                    {
+                        "name": "isbn",
+                        "in": "query",
+                        "required": False,
+                        "schema": {"type": "string"},
+                        "description": "Filter by ISBN (ISBN-10 or ISBN-13, hyphens ignored)",
+                    },
+                    {
+                        "name": "year_from",
+                        "in": "query",
+                        "required": False,
+                        "schema": {"type": "integer"},
+                        "description": "Published in or after this year (requires a published_year sort)",
+                    },
+                    {
+                        "name": "year_to",
+                        "in": "query",
+                        "required": False,
+                        "schema": {"type": "integer"},
+                        "description": "Published in or before this year (requires a published_year sort)",
+                    },
+                    {
+                        "name": "sort",
+                        "in": "query",
+                        "required": False,
+                        "schema": {
+                            "type": "string",
+                            "enum": ["id", "-id", "published_year", "-published_year"],
+                            "default": "id",
+                        },
+                        "description": (
+                            "Sort key, '-' for descending. Filter/sort combinations without a supporting "
+                            "index are rejected with 400"
+                        ),
+                    },
+                    {"$ref": "#/components/parameters/BookFields"},
                 ],
                 "responses": {
                     "200": {
-                        "description": "A list of books",
+                        "description": "A page of books",
                         "content": {
                             "application/json": {
-                                "schema": {
-                                    "type": "array",
-                                    "items": {"$ref": "#/components/schemas/Book"},
-                                }
+                                "schema": {"$ref": "#/components/schemas/BookPage"}
                             }
                         },
                     },
@@ -102,6 +170,220 @@ OPENAPI_SPEC = {
                 },
             },
         },
+        "/books/bulk": {
+            "post": {
+                "summary": "Bulk create books",
+                "description": (
+                    "Create many books at once (requires authentication). Send a JSON array, or an "
+                    "application/x-ndjson stream with one book per line. Items are validated like "
+                    "POST /books and a failing item never aborts the rest of the batch."
+                ),
+                "requestBody": {
+                    "required": True,
+                    "content": {
+                        "application/json": {
+                            "schema": {
+                                "type": "array",
+                                "items": {"$ref": "#/components/schemas/BookCreate"},
+                            }
+                        },
+                        "application/x-ndjson": {
+                            "schema": {"$ref": "#/components/schemas/BookCreate"}
+                        },
+                    },
+                },
+                "responses": {
+                    "200": {
+                        "description": "Per-item results",
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "status": {"type": "string"},
+                                        "created": {"type": "integer"},
+                                        "failed": {"type": "integer"},
+                                        "results": {
+                                            "type": "array",
+                                            "items": {
+                                                "type": "object",
+                                                "properties": {
+                                                    "index": {"type": "integer"},
+                                                    "id": {"type": "integer", "nullable": True},
+                                                    "status": {"type": "string", "enum": ["created", "error"]},
+                                                    "error": {"type": "string"},
+                                                },
+                                            },
+                                        },
+                                    },
+                                }
+                            }
+                        },
+                    },
+                    "400": {
+                        "description": "Body is not a JSON array or NDJSON stream",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/Error"}
+                            }
+                        },
+                    },
+                    "401": {
+                        "description": "Unauthorized",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/Error"}
+                            }
+                        },
+                    },
+                },
+            }
+        },
+        "/books/search": {
+            "get": {
+                "summary": "Search books by title",
+                "description": (
+                    "Full-text search over titles: every word of q must match (stemmed). "
+                    "Results are ranked best match first and paginated with next_cursor."
+                ),
+                "parameters": [
+                    {
+                        "name": "q",
+                        "in": "query",
+                        "required": True,
+                        "schema": {"type": "string", "maxLength": 200},
+                        "description": "Words to search for",
+                    },
+                    {
+                        "name": "author_id",
+                        "in": "query",
+                        "required": False,
+                        "schema": {"type": "integer"},
+                        "description": "Filter by author id",
+                    },
+                    {
+                        "name": "limit",
+                        "in": "query",
+                        "required": False,
+                        "schema": {"type": "integer", "minimum": 1},
+                        "description": "Page size (capped by the server maximum)",
+                    },
+                    {
+                        "name": "after",
+                        "in": "query",
+                        "required": False,
+                        "schema": {"type": "string"},
+                        "description": "Cursor returned as next_cursor by the previous page",
+                    },
+                    {"$ref": "#/components/parameters/BookFields"},
+                ],
+                "responses": {
+                    "200": {
+                        "description": "A page of matching books",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/BookPage"}
+                            }
+                        },
+                    },
+                    "400": {
+                        "description": "Invalid query parameter",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/Error"}
+                            }
+                        },
+                    },
+                },
+            }
+        },
+        "/books/export": {
+            "get": {
+                "summary": "Export books",
+                "description": (
+                    "Stream the whole catalog ordered by id as NDJSON (one Book per line) or CSV. "
+                    "The response is generated incrementally with constant server memory."
+                ),
+                "parameters": [
+                    {
+                        "name": "format",
+                        "in": "query",
+                        "required": False,
+                        "schema": {"type": "string", "enum": ["ndjson", "csv"], "default": "ndjson"},
+                    },
+                    {
+                        "name": "author_id",
+                        "in": "query",
+                        "required": False,
+                        "schema": {"type": "integer"},
+                        "description": "Filter by author id",
+                    },
+                ],
+                "responses": {
+                    "200": {
+                        "description": "Catalog export",
+                        "content": {
+                            "application/x-ndjson": {
+                                "schema": {"$ref": "#/components/schemas/Book"}
+                            },
+                            "text/csv": {"schema": {"type": "string"}},
+                        },
+                    },
+                    "400": {
+                        "description": "Invalid query parameter",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/Error"}
+                            }
+                        },
+                    },
+                },
+            }
+        },
+        "/books/isbn/{isbn}": {
+            "get": {
+                "summary": "Get book by ISBN",
+                "description": (
+                    "Look a book up by ISBN-10 or ISBN-13, with or without hyphens; "
+                    "both forms resolve to the same book."
+                ),
+                "parameters": [
+                    {
+                        "name": "isbn",
+                        "in": "path",
+                        "required": True,
+                        "schema": {"type": "string"},
+                    },
+                    {"$ref": "#/components/parameters/BookFields"},
+                ],
+                "responses": {
+                    "200": {
+                        "description": "Book found",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/Book"}
+                            }
+                        },
+                    },
+                    "400": {
+                        "description": "Not a valid ISBN",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/Error"}
+                            }
+                        },
+                    },
+                    "404": {
+                        "description": "Book not found",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/Error"}
+                            }
+                        },
+                    },
+                },
+            }
+        },
         "/books/{book_id}": {
             "get": {
                 "summary": "Get book by ID",
@@ -111,7 +393,8 @@ OPENAPI_SPEC = {
                         "in": "path",
                         "required": True,
                         "schema": {"type": "integer"},
-                    }
+                    },
+                    {"$ref": "#/components/parameters/BookFields"},
                 ],
                 "responses": {
                     "200": {
@@ -329,7 +612,15 @@ OPENAPI_SPEC = {
                         "in": "path",
                         "required": True,
                         "schema": {"type": "integer"},
-                    }
+                    },
+                    {"$ref": "#/components/parameters/BookFields"},
+                    {
+                        "name": "author_fields",
+                        "in": "query",
+                        "required": False,
+                        "schema": {"type": "string", "example": "name,country"},
+                        "description": "Comma-separated author fields to return (id is always included)",
+                    },
                 ],
                 "responses": {
                     "200": {
@@ -462,6 +753,18 @@ OPENAPI_SPEC = {
         },
     },
     "components": {
+        "parameters": {
+            "BookFields": {
+                "name": "fields",
+                "in": "query",
+                "required": False,
+                "schema": {"type": "string", "example": "id,title"},
+                "description": (
+                    "Comma-separated book fields to return (id is always included); "
+                    "genres are only queried when requested"
+                ),
+            }
+        },
         "schemas": {
             "Book": {
                 "type": "object",
@@ -480,6 +783,18 @@ OPENAPI_SPEC = {
                 },
                 "required": ["id", "title", "author_id"],
             },
+            "BookPage": {
+                "type": "object",
+                "properties": {
+                    "status": {"type": "string"},
+                    "books": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/Book"},
+                    },
+                    "limit": {"type": "integer"},
+                    "next_cursor": {"type": "string", "nullable": True},
+                },
+            },
             "BookCreate": {
                 "type": "object",
                 "properties": {
@@ -0,0 +1,11 @@
+"""Prometheus scrape endpoint."""
+from flask import Blueprint, Response
+
+from app.metrics import render_metrics
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.route("/metrics")
+def metrics():
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
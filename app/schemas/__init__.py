@@ -6,8 +6,24 @@ from app.schemas.validators import (
     validate_register,
     validate_login,
     parse_author_id_query,
+    parse_book_filters_query,
+    parse_pagination_query,
+    parse_export_format,
+    parse_search_query,
+    normalize_isbn,
+    parse_fields_query,
+    parse_author_fields_query,
+)
+from app.schemas.serializers import (
+    BOOK_CSV_COLUMNS,
+    BOOK_ROW_FIELDS,
+    AUTHOR_FIELDS,
+    book_to_dict,
+    book_row_to_dict,
+    book_row_to_csv_row,
+    author_to_dict,
+    encode_cursor,
 )
-from app.schemas.serializers import book_to_dict, author_to_dict
 
 __all__ = [
     "validate_book_create",
@@ -16,6 +32,19 @@ __all__ = [
     "validate_register",
     "validate_login",
     "parse_author_id_query",
+    "parse_book_filters_query",
+    "parse_pagination_query",
+    "parse_export_format",
+    "parse_search_query",
+    "normalize_isbn",
+    "parse_fields_query",
+    "parse_author_fields_query",
     "book_to_dict",
+    "book_row_to_dict",
+    "book_row_to_csv_row",
+    "BOOK_CSV_COLUMNS",
+    "BOOK_ROW_FIELDS",
+    "AUTHOR_FIELDS",
     "author_to_dict",
+    "encode_cursor",
 ]
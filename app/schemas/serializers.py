@@ -1,25 +1,43 @@
 """Serialize domain models to API-friendly dicts."""
+import base64
+import json
 from typing import Any
 
 from app.models import Author, Book
 
 
-def book_to_dict(book: Book) -> dict[str, Any]:
-    return {
-        "id": book.id,
-        "title": book.title,
-        "author_id": book.author_id,
-        "isbn": book.isbn,
-        "published_year": book.published_year,
-        "created_at": book.created_at.isoformat() if book.created_at else None,
-        "genres": [g.name for g in book.genres],
-    }
-
-
-def author_to_dict(author: Author) -> dict[str, Any]:
-    return {
-        "id": author.id,
-        "name": author.name,
-        "bio": author.bio,
-        "country": author.country,
-    }
+# Field order of book dicts and of the row tuples returned by BookService.list_rows / list_page_rows / iter_rows.
+BOOK_ROW_FIELDS = ("id", "title", "author_id", "isbn", "published_year", "created_at", "genres")
+AUTHOR_FIELDS = ("id", "name", "bio", "country")
+
+
+def book_to_dict(book: Book, fields: tuple = BOOK_ROW_FIELDS) -> dict[str, Any]:
+    """Serialize the requested fields; book.genres is only touched (and lazily loaded) when asked for."""
+    # created_at stays a datetime; it is encoded as ISO 8601 by app.json_provider
+    data = {field: getattr(book, field) for field in fields if field != "genres"}
+    if "genres" in fields:
+        data["genres"] = [g.name for g in book.genres]
+    return data
+
+
+def author_to_dict(author: Author, fields: tuple = AUTHOR_FIELDS) -> dict[str, Any]:
+    return {field: getattr(author, field) for field in fields}
+
+
+def encode_cursor(*keys) -> str:
+    """Encode keyset values (last one is always the book id) as an opaque, URL-safe cursor."""
+    raw = json.dumps(list(keys), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+BOOK_CSV_COLUMNS = list(BOOK_ROW_FIELDS)
+
+
+def book_row_to_dict(row: tuple, fields: tuple = BOOK_ROW_FIELDS) -> dict[str, Any]:
+    """Same shape as book_to_dict, built from a row projected with the same fields instead of a Book instance."""
+    return dict(zip(fields, row))
+
+
+def book_row_to_csv_row(row: tuple) -> list:
+    *columns, created_at, genres = row
+    return [*columns, created_at.isoformat() if created_at else None, ";".join(genres)]
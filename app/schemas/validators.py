@@ -1,7 +1,27 @@
 """Validation logic for API payloads."""
+import base64
+import binascii
 import datetime
+import json
+import os
+import re
 from typing import Optional, Tuple
 
+from app.schemas.serializers import AUTHOR_FIELDS, BOOK_ROW_FIELDS
+
+EXPORT_FORMATS = ("ndjson", "csv")
+DEFAULT_PAGE_SIZE = int(os.environ.get("BOOKS_DEFAULT_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.environ.get("BOOKS_MAX_PAGE_SIZE", "200"))
+SEARCH_QUERY_MAX_LENGTH = 200
+BOOK_SORTS = ("id", "-id", "published_year", "-published_year")
+# Equality filters that can drive each sort through an index (see the composite indexes on Book/book_genre):
+#   id:             books primary key, ix_books_author_id_id, ix_book_genre_genre_id_book_id, ix_books_created_by_id_id
+#   published_year: ix_books_published_year_id, ix_books_author_id_published_year_id
+# An isbn filter is served by the unique ix_books_isbn13 and combines with anything.
+INDEXED_SORT_FILTERS = {"id": ("author_id", "genre", "created_by_id"), "published_year": ("author_id",)}
+# ASCII digits only: str.isdigit() also accepts characters such as "²" that int() cannot parse.
+_ISBN_PATTERN = re.compile(r"[0-9]{9}[0-9X]|[0-9]{13}")
+
 
 def _non_empty_str(value, field: str, max_len: int) -> Tuple[bool, Optional[str]]:
     if value is None:
@@ -16,10 +36,23 @@ def _non_empty_str(value, field: str, max_len: int) -> Tuple[bool, Optional[str]
 def validate_isbn(isbn: Optional[str]) -> bool:
     if not isbn:
         return True
-    clean = isbn.replace("-", "").replace(" ", "")
-    if len(clean) not in (10, 13):
-        return False
-    return clean.isdigit() or (len(clean) == 10 and clean[-1].upper() == "X")
+    clean = isbn.replace("-", "").replace(" ", "").upper()
+    return _ISBN_PATTERN.fullmatch(clean) is not None
+
+
+def normalize_isbn(isbn: Optional[str]) -> Optional[str]:
+    """Return the ISBN-13 digits for a valid ISBN-10/13 (hyphens and spaces ignored), or None.
+
+    ISBN-10s are converted by prefixing 978 and recomputing the check digit, so both forms of a book compare equal.
+    """
+    if not isbn or not validate_isbn(isbn):
+        return None
+    clean = isbn.replace("-", "").replace(" ", "").upper()
+    if len(clean) == 13:
+        return clean
+    core = "978" + clean[:9]
+    total = sum(int(digit) * (3 if i % 2 else 1) for i, digit in enumerate(core))
+    return core + str((10 - total % 10) % 10)
 
 
 def validate_published_year(year: Optional[int]) -> bool:
@@ -205,10 +238,185 @@ def validate_login(data: dict) -> Tuple[bool, Optional[str], Optional[dict]]:
     }
 
 
-def parse_author_id_query(value: Optional[str]) -> Tuple[bool, Optional[str], Optional[int]]:
+def _parse_int_query(value: Optional[str], name: str) -> Tuple[bool, Optional[str], Optional[int]]:
     if value is None:
         return True, None, None
     try:
         return True, None, int(value)
     except ValueError:
-        return False, "Query parameter 'author_id' must be an integer", None
+        return False, f"Query parameter '{name}' must be an integer", None
+
+
+def parse_author_id_query(value: Optional[str]) -> Tuple[bool, Optional[str], Optional[int]]:
+    return _parse_int_query(value, "author_id")
+
+
+def parse_book_filters_query(args) -> Tuple[bool, Optional[str], Optional[dict]]:
+    """Parse the GET /books filters and sort from a query-args mapping into {"filters", "sort"}.
+
+    Filters: author_id, created_by_id, genre, isbn (normalized to ISBN-13), year_from, year_to (inclusive).
+    sort is one of BOOK_SORTS and defaults to published_year when a year range is given, id otherwise.
+    Combinations no index can serve (see INDEXED_SORT_FILTERS) are rejected instead of falling back to a table scan.
+    """
+    filters = {}
+    for name in ("author_id", "created_by_id", "year_from", "year_to"):
+        ok, err, value = _parse_int_query(args.get(name), name)
+        if not ok:
+            return False, err, None
+        if value is not None:
+            filters[name] = value
+    genre = args.get("genre")
+    if genre is not None:
+        if not genre.strip():
+            return False, "Query parameter 'genre' must be a non-empty string", None
+        filters["genre"] = genre.strip()
+    isbn = args.get("isbn")
+    if isbn is not None:
+        filters["isbn"] = normalize_isbn(isbn)
+        if filters["isbn"] is None:
+            return False, "Query parameter 'isbn' must be a valid ISBN-10 or ISBN-13", None
+    ranged = "year_from" in filters or "year_to" in filters
+    if "year_from" in filters and "year_to" in filters and filters["year_from"] > filters["year_to"]:
+        return False, "Query parameter 'year_from' must not be greater than 'year_to'", None
+
+    sort = args.get("sort") or ("published_year" if ranged else "id")
+    if sort not in BOOK_SORTS:
+        return False, f"Query parameter 'sort' must be one of: {', '.join(BOOK_SORTS)}", None
+    if "isbn" in filters:
+        return True, None, {"filters": filters, "sort": sort}
+
+    column = sort.lstrip("-")
+    if ranged and column != "published_year":
+        return False, "Filtering by year_from/year_to requires sort=published_year or sort=-published_year", None
+    equality = [name for name in ("author_id", "genre", "created_by_id") if name in filters]
+    if equality and not any(name in INDEXED_SORT_FILTERS[column] for name in equality):
+        supported = ", ".join(INDEXED_SORT_FILTERS[column])
+        return (
+            False,
+            f"sort={sort} cannot be combined with {', '.join(equality)} (no index); "
+            f"with this sort filter by {supported} or isbn",
+            None,
+        )
+    return True, None, {"filters": filters, "sort": sort}
+
+
+def parse_fields_query(
+    value: Optional[str], allowed: tuple = BOOK_ROW_FIELDS, param: str = "fields"
+) -> Tuple[bool, Optional[str], Optional[tuple]]:
+    """Parse a sparse fieldset such as ?fields=id,title into a tuple ordered like ``allowed``.
+
+    Absent means every field; ``id`` is always included so list cursors and clients can key on it.
+    """
+    if value is None:
+        return True, None, allowed
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    if not requested:
+        return False, f"Query parameter '{param}' must name at least one field", None
+    unknown = sorted(requested.difference(allowed))
+    if unknown:
+        return False, f"Unknown field(s) in '{param}': {', '.join(unknown)}; allowed: {', '.join(allowed)}", None
+    requested.add("id")
+    return True, None, tuple(name for name in allowed if name in requested)
+
+
+def parse_author_fields_query(value: Optional[str]) -> Tuple[bool, Optional[str], Optional[tuple]]:
+    return parse_fields_query(value, AUTHOR_FIELDS, "author_fields")
+
+
+def decode_cursor(cursor: str) -> Optional[list]:
+    """Decode an opaque pagination cursor into its list of keyset values, or None if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        keys = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError, binascii.Error):
+        return None
+    return keys if isinstance(keys, list) and keys else None
+
+
+def _parse_limit(limit: Optional[str]) -> Tuple[bool, Optional[str], Optional[int]]:
+    if limit is None:
+        return True, None, DEFAULT_PAGE_SIZE
+    try:
+        page_size = int(limit)
+    except ValueError:
+        return False, "Query parameter 'limit' must be an integer", None
+    if page_size < 1:
+        return False, "Query parameter 'limit' must be at least 1", None
+    return True, None, min(page_size, MAX_PAGE_SIZE)
+
+
+def parse_pagination_query(
+    limit: Optional[str], after: Optional[str], paginate: Optional[str], sort: str = "id"
+) -> Tuple[bool, Optional[str], Optional[dict]]:
+    """Parse ?limit=&after=&paginate= into {"paginate", "limit", "after_key"}.
+
+    ``paginate=false`` opts into the legacy unpaginated list; ``limit`` is clamped to MAX_PAGE_SIZE. The cursor
+    must have been issued for the same ``sort``: [id] for id sorts, [sort value, id] otherwise, where the sort
+    value is null once the listing has reached the books without one.
+    """
+    if paginate is not None and paginate.lower() in ("false", "0", "no"):
+        if limit is not None or after is not None:
+            return False, "Query parameters 'limit' and 'after' require pagination", None
+        return True, None, {"paginate": False, "limit": None, "after_key": None}
+
+    ok, err, page_size = _parse_limit(limit)
+    if not ok:
+        return False, err, None
+
+    after_key = None
+    if after is not None:
+        keys = decode_cursor(after)
+        key_count = 1 if sort.lstrip("-") == "id" else 2
+        if keys is None or len(keys) != key_count or not all(isinstance(key, int) for key in keys[-1:]):
+            return False, "Query parameter 'after' is not a valid cursor", None
+        if not all(key is None or isinstance(key, int) for key in keys[:-1]):
+            return False, "Query parameter 'after' is not a valid cursor", None
+        after_key = tuple(keys)
+
+    return True, None, {"paginate": True, "limit": page_size, "after_key": after_key}
+
+
+def parse_search_query(
+    q: Optional[str], limit: Optional[str], after: Optional[str]
+) -> Tuple[bool, Optional[str], Optional[dict]]:
+    """Parse ?q=&limit=&after= into {"q", "limit", "after"}.
+
+    ``q`` is reduced to its words joined by spaces (every word must match); ``after`` is the (rank, id) of the
+    last result on the previous page.
+    """
+    if q is None or not q.strip():
+        return False, "Query parameter 'q' is required", None
+    if len(q) > SEARCH_QUERY_MAX_LENGTH:
+        return False, f"Query parameter 'q' must not exceed {SEARCH_QUERY_MAX_LENGTH} characters", None
+    words = re.findall(r"\w+", q)
+    if not words:
+        return False, "Query parameter 'q' must contain at least one word", None
+
+    ok, err, page_size = _parse_limit(limit)
+    if not ok:
+        return False, err, None
+
+    after_key = None
+    if after is not None:
+        keys = decode_cursor(after)
+        valid = (
+            keys is not None
+            and len(keys) == 2
+            and isinstance(keys[0], (int, float))
+            and not isinstance(keys[0], bool)
+            and isinstance(keys[1], int)
+        )
+        if not valid:
+            return False, "Query parameter 'after' is not a valid cursor", None
+        after_key = (keys[0], keys[1])
+
+    return True, None, {"q": " ".join(words), "limit": page_size, "after": after_key}
+
+
+def parse_export_format(value: Optional[str]) -> Tuple[bool, Optional[str], Optional[str]]:
+    if value is None:
+        return True, None, "ndjson"
+    fmt = value.lower()
+    if fmt not in EXPORT_FORMATS:
+        return False, f"Query parameter 'format' must be one of: {', '.join(EXPORT_FORMATS)}", None
+    return True, None, fmt
@@ -2,5 +2,13 @@
 from app.services.book_service import BookService
 from app.services.author_service import AuthorService
 from app.services.user_service import UserService
+from app.services.catalog_version import add_catalog_listener, bump_catalog_version, get_catalog_version
 
-__all__ = ["BookService", "AuthorService", "UserService"]
+__all__ = [
+    "BookService",
+    "AuthorService",
+    "UserService",
+    "add_catalog_listener",
+    "bump_catalog_version",
+    "get_catalog_version",
+]
@@ -1,8 +1,9 @@
 """Author business logic."""
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, load_only
 
-from app.models import Author
+from app.models import Author, Book
+from app.services.catalog_version import bump_catalog_version
 
 
 class AuthorService:
@@ -23,16 +24,25 @@ class AuthorService:
                 country=payload.get("country"),
             )
             self._session.add(author)
+            bump_catalog_version(self._session, f"author:{author.id}")
             self._session.commit()
             return author, None
         except IntegrityError:
             self._session.rollback()
             return None, "Author already exists"
 
-    def get_with_books(self, author_id: int):
-        return (
-            self._session.query(Author)
-            .options(joinedload(Author.books))
-            .filter(Author.id == author_id)
-            .first()
-        )
+    def get_with_books(self, author_id: int, fields: tuple | None = None, author_fields: tuple | None = None):
+        """Author with books eagerly loaded, in one joined SELECT.
+
+        With ``fields`` / ``author_fields`` only those book / author columns are selected, and the genre query is
+        skipped unless "genres" is among ``fields``.
+        """
+        books = joinedload(Author.books)
+        if fields is not None:
+            books = books.load_only(*(getattr(Book, field) for field in fields if field != "genres"))
+        if fields is None or "genres" in fields:
+            books = books.selectinload(Book.genres)
+        options = [books]
+        if author_fields is not None:
+            options.append(load_only(*(getattr(Author, field) for field in author_fields)))
+        return self._session.query(Author).options(*options).filter(Author.id == author_id).first()
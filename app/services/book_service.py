@@ -1,10 +1,36 @@
 """Book business logic."""
 import datetime
 
+from sqlalchemy import and_, func, insert, literal_column, or_, select, table, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only, selectinload
 
-from app.models import Author, Book, Genre
+from app.models import SEARCH_CONFIG, SQLITE_SEARCH_TABLE, Author, Book, Genre, book_genre
+from app.schemas.validators import normalize_isbn
+from app.services.catalog_version import bump_catalog_version
+
+_UPSERT_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+# Every field of app.schemas.serializers.BOOK_ROW_FIELDS except "genres", which is aggregated separately.
+_BOOK_ROW_COLUMNS = {
+    "id": Book.id,
+    "title": Book.title,
+    "author_id": Book.author_id,
+    "isbn": Book.isbn,
+    "published_year": Book.published_year,
+    "created_at": Book.created_at,
+}
+_ALL_FIELDS = (*_BOOK_ROW_COLUMNS, "genres")
+_SORT_COLUMNS = {"id": Book.id, "published_year": Book.published_year}
+# group_concat separator for genre names: the ASCII unit separator, which no real genre name contains.
+_GENRE_SEPARATOR = "\x1f"
+
+
+def _has_year_range(filters: dict | None) -> bool:
+    """A year_from / year_to filter already excludes the books without a published_year."""
+    return bool(filters) and ("year_from" in filters or "year_to" in filters)
 
 
 class BookService:
@@ -12,15 +38,36 @@ class BookService:
         self._session = session
 
     def _get_or_create_genres(self, genre_names: list[str]) -> list:
-        result = []
-        for name in genre_names:
-            name = name.strip()
-            genre = self._session.query(Genre).filter_by(name=name).first()
-            if genre is None:
-                genre = Genre(name=name)
-                self._session.add(genre)
-            result.append(genre)
-        return result
+        """Resolve names to Genre rows: one SELECT for existing rows, one upsert for the missing ones."""
+        names = list(dict.fromkeys(name.strip() for name in genre_names))
+        if not names:
+            return []
+        by_name = {g.name: g for g in self._session.query(Genre).filter(Genre.name.in_(names))}
+        missing = [name for name in names if name not in by_name]
+        if missing:
+            by_name.update((g.name, g) for g in self._insert_genres(missing))
+            lost = [name for name in missing if name not in by_name]
+            if lost:
+                # Inserted concurrently by another transaction between our SELECT and INSERT
+                by_name.update((g.name, g) for g in self._session.query(Genre).filter(Genre.name.in_(lost)))
+        return [by_name[name] for name in names]
+
+    def _insert_genres(self, names: list[str]) -> list:
+        """INSERT ... ON CONFLICT (name) DO NOTHING RETURNING the new rows; plain ORM inserts elsewhere."""
+        dialect = self._session.get_bind().dialect
+        upsert = _UPSERT_INSERTS.get(dialect.name)
+        if upsert is None or not dialect.insert_returning:
+            genres = [Genre(name=name) for name in names]
+            self._session.add_all(genres)
+            self._session.flush()
+            return genres
+        stmt = (
+            upsert(Genre)
+            .values([{"name": name} for name in names])
+            .on_conflict_do_nothing(index_elements=[Genre.name])
+            .returning(Genre)
+        )
+        return list(self._session.scalars(stmt))
 
     def create(self, payload: dict, current_user) -> tuple:
         """Returns (book, None) or (None, error_message)."""
@@ -36,32 +83,296 @@ class BookService:
                 title=payload["title"],
                 author_id=payload["author_id"],
                 isbn=payload.get("isbn"),
+                isbn13=normalize_isbn(payload.get("isbn")),
                 published_year=payload.get("published_year"),
                 created_at=datetime.datetime.today(),
                 created_by=current_user,
                 genres=genre_objects,
             )
             self._session.add(book)
+            bump_catalog_version(self._session, "books", f"book:{book.id}", f"author:{book.author_id}")
             self._session.commit()
             return book, None
         except IntegrityError:
             self._session.rollback()
             return None, "A book with this ID or ISBN already exists"
 
+    def bulk_create(self, payloads: list[dict], user_id: int) -> list:
+        """Insert a chunk of validated payloads; returns an error message (or None) per payload, in order.
+
+        Authors, existing ids and ISBNs and genres are resolved with set-based queries, duplicates within the
+        chunk are caught up front, and books are written with a single executemany; a conflict only fails the
+        offending rows, never the whole chunk.
+        """
+        errors = [None] * len(payloads)
+        isbn13s = [normalize_isbn(p.get("isbn")) for p in payloads]
+        author_ids = {p["author_id"] for p in payloads}
+        known_authors = set(self._session.scalars(select(Author.id).where(Author.id.in_(author_ids))))
+        taken_ids = set(
+            self._session.scalars(select(Book.id).where(Book.id.in_([p["id"] for p in payloads])))
+        )
+        taken_isbns = set(
+            self._session.scalars(select(Book.isbn13).where(Book.isbn13.in_({i for i in isbn13s if i})))
+        )
+        accepted = []
+        for i, payload in enumerate(payloads):
+            if payload["author_id"] not in known_authors:
+                errors[i] = f"Author with id {payload['author_id']} not found"
+            elif payload["id"] in taken_ids or isbn13s[i] in taken_isbns:
+                errors[i] = "A book with this ID or ISBN already exists"
+            else:
+                taken_ids.add(payload["id"])
+                if isbn13s[i]:
+                    taken_isbns.add(isbn13s[i])
+                accepted.append(i)
+
+        try:
+            self._insert_books([payloads[i] for i in accepted], user_id)
+            self._session.commit()
+        except IntegrityError:
+            # Lost a race with a concurrent writer: retry row by row so only the conflicting rows fail.
+            self._session.rollback()
+            for i in accepted:
+                try:
+                    self._insert_books([payloads[i]], user_id)
+                    self._session.commit()
+                except IntegrityError:
+                    self._session.rollback()
+                    errors[i] = "A book with this ID or ISBN already exists"
+        return errors
+
+    def _insert_books(self, payloads: list[dict], user_id: int) -> None:
+        if not payloads:
+            return
+        bump_catalog_version(
+            self._session,
+            "books",
+            *(f"book:{p['id']}" for p in payloads),
+            *{f"author:{p['author_id']}" for p in payloads},
+        )
+        genres = self._get_or_create_genres([name for p in payloads for name in p.get("genres", [])])
+        genre_ids = {g.name: g.id for g in genres}
+        created_at = datetime.datetime.today()
+        self._session.execute(
+            insert(Book),
+            [
+                {
+                    "id": p["id"],
+                    "title": p["title"],
+                    "author_id": p["author_id"],
+                    "isbn": p.get("isbn"),
+                    "isbn13": normalize_isbn(p.get("isbn")),
+                    "published_year": p.get("published_year"),
+                    "created_at": created_at,
+                    "created_by_id": user_id,
+                }
+                for p in payloads
+            ],
+        )
+        links = [
+            {"book_id": p["id"], "genre_id": genre_ids[name]}
+            for p in payloads
+            for name in dict.fromkeys(n.strip() for n in p.get("genres", []))
+        ]
+        if links:
+            self._session.execute(insert(book_genre), links)
+
+    @staticmethod
+    def _filter_conditions(filters: dict | None) -> list:
+        """WHERE clauses for the GET /books filters (see parse_book_filters_query)."""
+        filters = filters or {}
+        conditions = []
+        equality = {"author_id": Book.author_id, "created_by_id": Book.created_by_id, "isbn": Book.isbn13}
+        for name, column in equality.items():
+            if name in filters:
+                conditions.append(column == filters[name])
+        if "year_from" in filters:
+            conditions.append(Book.published_year >= filters["year_from"])
+        if "year_to" in filters:
+            conditions.append(Book.published_year <= filters["year_to"])
+        if "genre" in filters:
+            genre_books = (
+                select(book_genre.c.book_id)
+                .join(Genre, Genre.id == book_genre.c.genre_id)
+                .where(Genre.name == filters["genre"])
+            )
+            conditions.append(Book.id.in_(genre_books))
+        return conditions
+
+    @staticmethod
+    def _sort_keys(sort: str) -> tuple:
+        """Keyset columns for a sort: (id,) or (sort column, id)."""
+        column = _SORT_COLUMNS[sort.lstrip("-")]
+        return (Book.id,) if column is Book.id else (column, Book.id)
+
+    def _sorted(self, stmt, sort: str, after_key: tuple | None = None, null_tail: bool = True) -> list:
+        """Statements that together list ``stmt`` in ``sort`` order, resuming after ``after_key``.
+
+        Sorting by a nullable column returns two parts: the books that have a value, then (unless ``null_tail``
+        is False because the filters already exclude them) the books without one, by id: NULLs come last in either
+        direction. Each part is read from an index in keyset order; a key whose sort value is None resumes in the
+        second part.
+        """
+        keys = self._sort_keys(sort)
+        descending = sort.startswith("-")
+
+        def ordered(part, part_keys: tuple, after: tuple | None):
+            if after is not None:
+                key, value = (part_keys[0], after[0]) if len(part_keys) == 1 else (tuple_(*part_keys), tuple_(*after))
+                part = part.where(key < value if descending else key > value)
+            return part.order_by(*(key.desc() if descending else key for key in part_keys))
+
+        if len(keys) == 1:
+            return [ordered(stmt, keys, after_key)]
+        parts = []
+        in_null_tail = after_key is not None and after_key[0] is None
+        if not in_null_tail:
+            parts.append(ordered(stmt.where(keys[0].is_not(None)), keys, after_key))
+        if null_tail:
+            parts.append(ordered(stmt.where(keys[0].is_(None)), (Book.id,), after_key[1:] if in_null_tail else None))
+        return parts
+
     def list_all(self, author_id: int | None = None) -> list:
-        q = self._session.query(Book)
+        q = self._session.query(Book).options(selectinload(Book.genres))
         if author_id is not None:
             q = q.filter(Book.author_id == author_id)
         return q.all()
 
-    def get_by_id(self, book_id: int):
-        return self._session.get(Book, book_id)
+    def _genre_names(self):
+        """Correlated subquery aggregating a book's genre names: array_agg on PostgreSQL, group_concat elsewhere."""
+        if self._session.get_bind().dialect.name == "postgresql":
+            aggregate = func.array_agg(Genre.name)
+        else:
+            aggregate = func.group_concat(Genre.name, _GENRE_SEPARATOR)
+        return (
+            select(aggregate)
+            .select_from(book_genre.join(Genre, Genre.id == book_genre.c.genre_id))
+            .where(book_genre.c.book_id == Book.id)
+            .correlate(Book)
+            .scalar_subquery()
+        )
+
+    def _rows_query(self, filters: dict | None, fields: tuple):
+        """SELECT the requested fields (which must start with "id") in order; genres are aggregated only if asked."""
+        columns = [_BOOK_ROW_COLUMNS[field] for field in fields if field != "genres"]
+        if "genres" in fields:
+            columns.append(self._genre_names())
+        return select(*columns).where(*self._filter_conditions(filters))
+
+    @staticmethod
+    def _with_genre_lists(rows, fields: tuple):
+        """Yield plain tuples; when genres were selected the last item becomes a list, whichever aggregate ran."""
+        if "genres" not in fields:
+            yield from map(tuple, rows)
+            return
+        for *columns, genres in rows:
+            if genres is None:
+                genres = []
+            elif isinstance(genres, str):
+                genres = genres.split(_GENRE_SEPARATOR)
+            yield (*columns, genres)
+
+    def _fetch_page(self, parts: list, limit: int, fields: tuple, sort_key=None) -> tuple:
+        """Run one keyset page over ``parts`` (see _sorted), in order. Returns (rows, next_key): next_key is (id,)
+        or, with a sort_key expression selected alongside the row, (sort value, id); it is None on the final page."""
+        rows, keys = [], []
+        for stmt in parts:
+            wanted = limit + 1 - len(rows)
+            if wanted <= 0:
+                break
+            if sort_key is None:
+                part_rows = list(self._with_genre_lists(self._session.execute(stmt.limit(wanted)), fields))
+                keys += [(row[0],) for row in part_rows]
+            else:
+                result = self._session.execute(stmt.add_columns(sort_key).limit(wanted)).all()
+                keys += [(row[-1], row[0]) for row in result]
+                part_rows = list(self._with_genre_lists((row[:-1] for row in result), fields))
+            rows += part_rows
+        if len(rows) > limit:
+            return rows[:limit], keys[limit - 1]
+        return rows, None
+
+    def list_rows(self, filters: dict | None = None, sort: str = "id", fields: tuple = _ALL_FIELDS) -> list:
+        """Every matching book as a read-only row tuple of ``fields``, bypassing the ORM identity map."""
+        rows = []
+        for stmt in self._sorted(self._rows_query(filters, fields), sort, null_tail=not _has_year_range(filters)):
+            rows += self._with_genre_lists(self._session.execute(stmt), fields)
+        return rows
+
+    def list_page_rows(
+        self,
+        limit: int,
+        after_key: tuple | None = None,
+        filters: dict | None = None,
+        sort: str = "id",
+        fields: tuple = _ALL_FIELDS,
+    ) -> tuple:
+        """Keyset page of row tuples in ``sort`` order. Returns (rows, next_key), see _fetch_page."""
+        parts = self._sorted(self._rows_query(filters, fields), sort, after_key, not _has_year_range(filters))
+        keys = self._sort_keys(sort)
+        return self._fetch_page(parts, limit, fields, keys[0] if len(keys) > 1 else None)
+
+    def iter_rows(self, author_id: int | None = None, batch_size: int = 1000, fields: tuple = _ALL_FIELDS):
+        """Yield every book as a row tuple ordered by id through a server-side cursor, batch_size rows at a time."""
+        filters = {"author_id": author_id} if author_id is not None else None
+        (stmt,) = self._sorted(self._rows_query(filters, fields), "id")
+        stmt = stmt.execution_options(stream_results=True, yield_per=batch_size)
+        yield from self._with_genre_lists(self._session.execute(stmt), fields)
+
+    def _search_match(self, q: str):
+        """Return (rank, condition, fts_table) for ``q``; lower rank is a better match on every dialect."""
+        if self._session.get_bind().dialect.name == "postgresql":
+            vector = literal_column("books.search_vector")
+            query = func.plainto_tsquery(SEARCH_CONFIG, q)
+            return -func.ts_rank(vector, query), vector.op("@@")(query), None
+        # SQLite FTS5: every word quoted so user input can never be parsed as query syntax; bm25 is lower-is-better
+        fts = table(SQLITE_SEARCH_TABLE, literal_column("rowid"))
+        fts_query = " ".join(f'"{word}"' for word in q.split())
+        match = literal_column(SQLITE_SEARCH_TABLE).op("MATCH")(fts_query)
+        return func.bm25(literal_column(SQLITE_SEARCH_TABLE)), match, fts
+
+    def search_rows(
+        self,
+        q: str,
+        limit: int,
+        after: tuple | None = None,
+        author_id: int | None = None,
+        fields: tuple = _ALL_FIELDS,
+    ) -> tuple:
+        """Page of row tuples whose title matches every word of ``q``, best match first (ties by id).
+
+        ``after`` is the (rank, id) key of the previous page's last row. Returns (rows, next_key) where
+        next_key is None on the final page.
+        """
+        rank, condition, fts = self._search_match(q)
+        filters = {"author_id": author_id} if author_id is not None else None
+        stmt = self._rows_query(filters, fields).where(condition)
+        if fts is not None:
+            stmt = stmt.join(fts, fts.c.rowid == Book.id)
+        if after is not None:
+            after_rank, after_id = after
+            stmt = stmt.where(or_(rank > after_rank, and_(rank == after_rank, Book.id > after_id)))
+        return self._fetch_page([stmt.order_by(rank, Book.id)], limit, fields, rank)
+
+    def get_by_isbn(self, isbn13: str, fields: tuple = _ALL_FIELDS):
+        """Row tuple of ``fields`` for the book with this normalized ISBN-13 (one unique-index probe), or None."""
+        stmt = self._rows_query(None, fields).where(Book.isbn13 == isbn13)
+        rows = list(self._with_genre_lists(self._session.execute(stmt), fields))
+        return rows[0] if rows else None
+
+    def get_by_id(self, book_id: int, fields: tuple | None = None):
+        """Load a book; with ``fields`` only those columns are selected (genres still load lazily on access)."""
+        if fields is None:
+            return self._session.get(Book, book_id)
+        columns = [_BOOK_ROW_COLUMNS[field] for field in fields if field != "genres"]
+        return self._session.get(Book, book_id, options=[load_only(*columns)])
 
     def update(self, book_id: int, payload: dict) -> tuple:
         """Returns (book, None) or (None, error_message)."""
         book = self._session.get(Book, book_id)
         if book is None:
             return None, "Book not found"
+        previous_author_id = book.author_id
 
         if "author_id" in payload:
             author = self._session.get(Author, payload["author_id"])
@@ -73,17 +384,22 @@ class BookService:
             book.title = payload["title"]
         if "isbn" in payload:
             book.isbn = payload["isbn"]
+            book.isbn13 = normalize_isbn(payload["isbn"])
         if "published_year" in payload:
             book.published_year = payload["published_year"]
         if "genres" in payload:
             book.genres = self._get_or_create_genres(payload["genres"])
 
         try:
+            bump_catalog_version(
+                self._session, "books", f"book:{book_id}", f"author:{previous_author_id}", f"author:{book.author_id}"
+            )
             self._session.commit()
             return book, None
         except IntegrityError:
             self._session.rollback()
-            return None, "Database integrity error"
+            # isbn13 is the only unique column an update can collide on
+            return None, "A book with this ISBN already exists"
 
     def delete(self, book_id: int, user_id: int) -> tuple:
         """Returns (True, None) or (False, error_message)."""
@@ -93,5 +409,6 @@ class BookService:
         if book.created_by_id is None or book.created_by_id != user_id:
             return False, "Forbidden"
         self._session.delete(book)
+        bump_catalog_version(self._session, "books", f"book:{book_id}", f"author:{book.author_id}")
         self._session.commit()
         return True, None
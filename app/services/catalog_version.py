@@ -0,0 +1,71 @@
+"""Catalog version counter shared by every process through the database.
+
+Writers also name what they touched with tags ("books", "book:<id>", "author:<id>"); once the transaction
+commits, listeners registered with add_catalog_listener (e.g. the response cache) receive those tags.
+"""
+from datetime import datetime
+
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from app.models import CatalogVersion
+
+_ROW_ID = 1
+_listeners = []
+
+
+def add_catalog_listener(callback) -> None:
+    """Register callback(tags: set[str], version: int) to run after every commit that changed the catalog."""
+    if callback not in _listeners:
+        _listeners.append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_listeners(session):
+    tags = session.info.pop("catalog_tags", None)
+    version = session.info.pop("catalog_version", None)
+    if tags or version is not None:
+        for callback in _listeners:
+            callback(tags or set(), version)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_tags(session):
+    session.info.pop("catalog_tags", None)
+    session.info.pop("catalog_version", None)
+
+
+@event.listens_for(Session, "before_commit")
+def _increment_version(session):
+    # Every writer in every process updates the same row: take its lock only once the rest of the transaction
+    # has been flushed, so concurrent writers wait for a commit rather than for a whole bulk insert.
+    if "catalog_tags" not in session.info or "catalog_version" in session.info:
+        return
+    session.flush()
+    version = session.execute(
+        update(CatalogVersion)
+        .where(CatalogVersion.id == _ROW_ID)
+        .values(version=CatalogVersion.version + 1, updated_at=datetime.utcnow())
+        .returning(CatalogVersion.version)
+    ).scalar()
+    if version is None:
+        # Only before the migration's seed row exists (e.g. tables built with create_all)
+        version = 1
+        session.add(CatalogVersion(id=_ROW_ID, version=version, updated_at=datetime.utcnow()))
+    session.info["catalog_version"] = version
+
+
+def bump_catalog_version(session: Session, *tags: str) -> None:
+    """Increment the version in the caller's transaction, so it commits or rolls back with the write.
+
+    The increment itself runs as the last statement before the commit (see _increment_version).
+    """
+    session.info.setdefault("catalog_tags", set()).update(tags)
+
+
+def get_catalog_version(session: Session) -> tuple:
+    """Returns (version, updated_at); (0, None) if nothing was ever written."""
+    row = session.get(CatalogVersion, _ROW_ID, populate_existing=True)
+    if row is None:
+        return 0, None
+    return row.version, row.updated_at
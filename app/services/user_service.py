@@ -1,7 +1,8 @@
 """User and auth business logic."""
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.auth import hash_password, verify_password
+from app.hashing import hash_password, verify_password
 from app.models import Users
 
 
@@ -10,22 +11,37 @@ class UserService:
         self._session = session
 
     def register(self, username: str, password: str) -> tuple:
-        """Returns (user, None) or (None, error_message)."""
-        if self._session.query(Users).filter_by(username=username).first():
+        """Returns (user, None) or (None, error_message).
+
+        The name is checked before hashing, so duplicates never take a slot in the hashing pool; the session is
+        closed while bcrypt runs and reopens for the insert.
+        """
+        if self.get_by_username(username):
             return None, "Username already exists"
+        self._session.close()
         user = Users(username=username, hashed_password=hash_password(password))
         self._session.add(user)
-        self._session.commit()
+        try:
+            self._session.commit()
+        except IntegrityError:
+            # Concurrent registration of the same name lost the race on ix_users_username
+            self._session.rollback()
+            return None, "Username already exists"
         return user, None
 
     def get_by_username(self, username: str):
         return self._session.query(Users).filter_by(username=username).first()
 
     def authenticate(self, username: str, password: str) -> tuple:
-        """Returns (user, None) if valid, else (None, 'user_not_found'|'invalid_password')."""
+        """Returns (user, None) if valid, else (None, 'user_not_found'|'invalid_password').
+
+        The user is loaded, then the session is closed before verify_password, so no pooled connection is held
+        during bcrypt; the returned user is detached.
+        """
         user = self.get_by_username(username)
         if not user:
             return None, "user_not_found"
+        self._session.close()
         if not verify_password(password, user.hashed_password):
             return None, "invalid_password"
         return user, None
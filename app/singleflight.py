@@ -0,0 +1,102 @@
+"""Request coalescing: concurrent identical reads share one execution of the view.
+
+The first request for a key (the leader) runs the view; requests for the same key that arrive while it is
+running wait and reuse its encoded body instead of issuing the same query and serialization again. Keys
+include the catalog version the request observed, so a read that starts after a write never receives a
+result computed before it.
+"""
+import os
+import threading
+from functools import wraps
+
+from flask import Response, g, make_response, request
+
+from app.metrics import registry
+from app.response_cache import cache_key
+
+SINGLE_FLIGHT_TIMEOUT_SECONDS = float(os.environ.get("SINGLE_FLIGHT_TIMEOUT_SECONDS", "30"))
+# Comma-separated endpoint names (e.g. "books.get_book_by_id") that should not coalesce
+SINGLE_FLIGHT_DISABLED = {
+    name.strip() for name in os.environ.get("SINGLE_FLIGHT_DISABLED", "").split(",") if name.strip()
+}
+
+SHARED_TOTAL = registry.counter(
+    "single_flight_shared_total", "Requests answered with another request's in-flight result.", ("endpoint",)
+)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, timeout: float):
+        """Return fn() for the leader and its result (or exception) for callers that joined it.
+
+        Returns (result, shared). A follower that waits longer than timeout runs fn() itself.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if call.done.wait(timeout):
+                if call.error is not None:
+                    raise call.error
+                return call.result, True
+            return fn(), False
+
+        try:
+            call.result = fn()
+            return call.result, False
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+single_flight = SingleFlight()
+
+
+def coalesce_requests(f):
+    """Share one execution of a GET view among concurrent identical requests (see SINGLE_FLIGHT_DISABLED)."""
+
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if request.endpoint in SINGLE_FLIGHT_DISABLED:
+            return f(*args, **kwargs)
+
+        def run():
+            response = make_response(f(*args, **kwargs))
+            return response.status_code, response.get_data(), list(response.headers.items())
+
+        key = (cache_key(), g.get("catalog_version"))
+        (status, body, headers), shared = single_flight.do(key, run, SINGLE_FLIGHT_TIMEOUT_SECONDS)
+        if shared:
+            SHARED_TOTAL.inc((request.endpoint,))
+        return Response(body, status=status, headers=headers)
+
+    return decorated
+
+
+registry.register_collector(
+    lambda: [("single_flight_in_flight", "gauge", "Distinct coalesced calls running.", single_flight.in_flight())]
+)
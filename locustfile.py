@@ -17,6 +17,13 @@ def _random_suffix(length: int = 8) -> str:
     return "".join(random.choices(string.ascii_lowercase + string.digits, k=length))
 
 
+def _random_isbn13() -> str:
+    """A valid, random ISBN-13, so created books don't all collide on the unique ISBN."""
+    core = "978" + "".join(random.choices(string.digits, k=9))
+    total = sum(int(digit) * (3 if i % 2 else 1) for i, digit in enumerate(core))
+    return core + str((10 - total % 10) % 10)
+
+
 class BooksApiUser(HttpUser):
     """
     Simulates a user that:
@@ -80,7 +87,7 @@ class BooksApiUser(HttpUser):
             "title": title,
             # Use a small author_id; for higher success rate, you can pre-seed authors with id=1.
             "author_id": 1,
-            "isbn": "9780132350884",
+            "isbn": _random_isbn13(),
             "published_year": 2020,
             "genres": ["LoadTest"],
         }
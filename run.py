@@ -1,7 +1,33 @@
-"""Run the Books API."""
-from app.main import app
-from waitress import serve
+"""Run the Books API.
+
+SERVER_MODE=wsgi (default) serves the Flask app with waitress threads; SERVER_MODE=asgi serves app.asgi with
+uvicorn, where the hot catalog reads run on async SQLAlchemy and every other route goes to the same Flask app.
+Both run SERVER_WORKERS processes (default: one per CPU); in WSGI mode these are app.prefork workers.
+"""
+import os
+
+from app.database import SERVER_THREADS
+
+SERVER_MODE = os.environ.get("SERVER_MODE", "wsgi").lower()
+SERVER_HOST = os.environ.get("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.environ.get("SERVER_PORT", "5000"))
 
 if __name__ == "__main__":
-    # app.run(debug=True, port=5000)
-    serve(app, host="0.0.0.0", port=5000, threads=4)
+    from app.prefork import SERVER_WORKERS
+
+    if SERVER_MODE == "asgi":
+        import uvicorn
+
+        uvicorn.run("app.asgi:app", host=SERVER_HOST, port=SERVER_PORT, workers=SERVER_WORKERS, log_level="warning")
+    elif SERVER_WORKERS > 1:
+        from app.main import app
+        from app.prefork import PreforkServer
+
+        PreforkServer(app, SERVER_HOST, SERVER_PORT, workers=SERVER_WORKERS, threads=SERVER_THREADS).run()
+    else:
+        from waitress import serve
+
+        from app.main import app
+
+        # app.run(debug=True, port=5000)
+        serve(app, host=SERVER_HOST, port=SERVER_PORT, threads=SERVER_THREADS)
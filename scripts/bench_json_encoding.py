@@ -0,0 +1,73 @@
+"""Benchmark JSON encoding of a 10k-book GET /books payload: stdlib vs orjson providers.
+
+Run from project root: python -m scripts.bench_json_encoding [--books 10000] [--rounds 20]
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+
+from flask import Flask
+
+# Add project root so app is importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.json_provider import OrjsonProvider, StdlibJSONProvider, orjson
+
+
+def _payload(n_books: int) -> dict:
+    created_at = datetime.datetime(2024, 1, 1, 12, 30, 15, 123456)
+    books = [
+        {
+            "id": i,
+            "title": f"Book number {i}",
+            "author_id": i % 500,
+            "isbn": "9780132350884",
+            "published_year": 1950 + i % 75,
+            "created_at": created_at,
+            "genres": ["Fiction", "Classics", f"Genre {i % 40}"],
+        }
+        for i in range(n_books)
+    ]
+    return {"status": "success", "books": books, "limit": n_books, "next_cursor": None}
+
+
+def _bench(provider, payload, rounds: int) -> tuple:
+    app = Flask(__name__)
+    encoder = provider(app)
+    with app.app_context():
+        size = len(encoder.response(payload).get_data())
+        started = time.perf_counter()
+        for _ in range(rounds):
+            encoder.response(payload).get_data()
+        elapsed = time.perf_counter() - started
+    return elapsed / rounds, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    payload = _payload(args.books)
+    providers = [("stdlib", StdlibJSONProvider)]
+    if orjson is not None:
+        providers.append(("orjson", OrjsonProvider))
+    else:
+        print("orjson not installed; only the stdlib provider is measured.")
+
+    baseline = None
+    for name, provider in providers:
+        per_round, size = _bench(provider, payload, args.rounds)
+        baseline = baseline or per_round
+        print(
+            f"{name:>7}: {per_round * 1000:8.2f} ms/payload  "
+            f"{args.books / per_round:12,.0f} books/s  {size / per_round / 1e6:8.1f} MB/s  "
+            f"x{baseline / per_round:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
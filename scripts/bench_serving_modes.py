@@ -0,0 +1,113 @@
+"""Benchmark the WSGI (waitress) and ASGI (uvicorn + async SQLAlchemy) serving modes under locustfile.py.
+
+Each mode is started with run.py on its own port against the configured DATABASE_URL, loaded with the same
+headless Locust run, then stopped. Requests/s, median and p95 latency are compared per request name.
+The ASGI routes skip the response cache and request coalescing, so both are turned off for the WSGI run too;
+otherwise the comparison would measure cache hits against database reads.
+
+Run from project root: python -m scripts.bench_serving_modes [--users 100] [--spawn-rate 20] [--duration 1m]
+"""
+import argparse
+import csv
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ("wsgi", "asgi")
+# Endpoints served natively by app.asgi, which has no request coalescing.
+CATALOG_ENDPOINTS = (
+    "books.get_books",
+    "books.search_books",
+    "books.get_book_by_isbn",
+    "books.get_book_by_id",
+    "authors.get_author_books",
+)
+
+
+def _wait_until_up(url: str, process, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with status {process.returncode}")
+        try:
+            with urllib.request.urlopen(url, timeout=1):
+                return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    raise RuntimeError(f"server at {url} did not come up within {timeout:.0f}s")
+
+
+def _read_stats(csv_prefix: str) -> dict:
+    """Locust's <prefix>_stats.csv as {name: (requests/s, p50 ms, p95 ms, failures)}."""
+    stats = {}
+    with open(f"{csv_prefix}_stats.csv", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            stats[row["Name"]] = (
+                float(row["Requests/s"]),
+                float(row["50%"] or 0),
+                float(row["95%"] or 0),
+                int(row["Failure Count"]),
+            )
+    return stats
+
+
+def _run_mode(mode: str, port: int, args, workdir: str) -> dict:
+    env = {
+        **os.environ,
+        "SERVER_MODE": mode,
+        "SERVER_PORT": str(port),
+        "RESPONSE_CACHE_SIZE": "0",
+        "SINGLE_FLIGHT_DISABLED": ",".join(CATALOG_ENDPOINTS),
+    }
+    env.pop("RESPONSE_CACHE_URL", None)
+    server = subprocess.Popen([sys.executable, "run.py"], cwd=ROOT, env=env)  # pylint: disable=consider-using-with
+    host = f"http://127.0.0.1:{port}"
+    try:
+        _wait_until_up(f"{host}/", server)
+        csv_prefix = os.path.join(workdir, mode)
+        subprocess.run(
+            [
+                sys.executable, "-m", "locust", "-f", os.path.join(ROOT, "locustfile.py"), "--headless",
+                "-u", str(args.users), "-r", str(args.spawn_rate), "-t", args.duration,
+                "-H", host, "--csv", csv_prefix, "--only-summary",
+            ],
+            cwd=ROOT,
+            check=False,
+        )
+        return _read_stats(csv_prefix)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--spawn-rate", type=int, default=20)
+    parser.add_argument("--duration", default="1m")
+    parser.add_argument("--port", type=int, default=5050)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        results = {mode: _run_mode(mode, args.port + i, args, workdir) for i, mode in enumerate(MODES)}
+
+    names = sorted(set().union(*results.values()), key=lambda n: (n == "Aggregated", n))
+    print(f"\n{'request':<28}" + "".join(f"{mode + ' rps':>11}{'p50':>7}{'p95':>7}{'fail':>6}" for mode in MODES))
+    for name in names:
+        line = f"{name:<28}"
+        for mode in MODES:
+            rps, p50, p95, failures = results[mode].get(name, (0.0, 0, 0, 0))
+            line += f"{rps:>11.1f}{p50:>7.0f}{p95:>7.0f}{failures:>6}"
+        print(line)
+    wsgi, asgi = results["wsgi"].get("Aggregated"), results["asgi"].get("Aggregated")
+    if wsgi and asgi and wsgi[0]:
+        print(f"\nasgi / wsgi throughput: x{asgi[0] / wsgi[0]:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -38,6 +38,10 @@ def main():
                 """)
             )
             r3 = conn.execute(text("DELETE FROM users WHERE username LIKE 'locust_%'"))
+            # Invalidate ETags / cached responses held by running API processes
+            conn.execute(
+                text("UPDATE catalog_version SET version = version + 1, updated_at = CURRENT_TIMESTAMP")
+            )
             deleted_books = r2.rowcount
             deleted_users = r3.rowcount
     print(f"Cleanup done: {deleted_users} locust users, {deleted_books} books removed.")
@@ -1,5 +1,6 @@
 """Pytest fixtures for API tests."""
 import os
+from contextlib import contextmanager
 
 # Set test env before any app import
 os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
@@ -7,15 +8,18 @@ os.environ.setdefault("SECRET_KEY", "test-secret-key")
 
 import pytest
 import httpx
-from sqlalchemy import text
+from sqlalchemy import event, text
 
 # Import after env is set
 from app.main import app
+from app.auth import clear_user_cache
+from app.conditional import clear_catalog_version_cache
 from app.database import engine
 from app.models import Base
+from app.response_cache import response_cache
 
 # Tables to clear (order: FK dependencies first)
-_CLEAN_TABLES = ["book_genre", "books", "authors", "genres", "users", "tasks"]
+_CLEAN_TABLES = ["book_genre", "books", "authors", "genres", "users", "tasks", "catalog_version"]
 
 
 def _clean_db():
@@ -28,6 +32,27 @@ def _clean_db():
                     pass
 
 
+@contextmanager
+def _count_statements():
+    """Collect SQL statements executed on the engine inside the block."""
+    statements = []
+
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _before_execute)
+
+
+@pytest.fixture
+def count_statements():
+    """Context manager factory: `with count_statements() as stmts:` records executed SQL."""
+    return _count_statements
+
+
 @pytest.fixture(scope="session")
 def _setup_db():
     """Create tables once per test session."""
@@ -40,6 +65,9 @@ def _setup_db():
 def db_tables(_setup_db):
     """Ensure DB is set up and clean before each test."""
     _clean_db()
+    clear_user_cache()
+    clear_catalog_version_cache()
+    response_cache.clear()
     yield
 
 
@@ -71,3 +99,24 @@ def author_id(client, auth_headers):
     )
     assert r.status_code == 201
     return 1
+
+
+@pytest.fixture
+def create_books(client, auth_headers, author_id):
+    """Return a helper that creates a book for each given id through POST /books."""
+
+    def create(ids):
+        for book_id in ids:
+            r = client.post(
+                "/books",
+                json={
+                    "id": book_id,
+                    "title": f"Book {book_id}",
+                    "author_id": author_id,
+                    "genres": [f"Genre {book_id}", "Shared"],
+                },
+                headers=auth_headers,
+            )
+            assert r.status_code == 201
+
+    return create
@@ -0,0 +1,97 @@
+"""ASGI serving mode: native async reads on aiosqlite, Flask fallback for everything else."""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from app import async_database
+from app.asgi import app as asgi_app
+from app.async_database import async_url
+from app.models import Base
+from app.services import AuthorService, BookService
+
+GZIP = {"Accept-Encoding": "gzip"}
+
+
+@pytest.fixture
+def asgi_client(tmp_path, monkeypatch):
+    """TestClient for app.asgi whose async sessions use a seeded SQLite file (the Flask app keeps :memory:)."""
+    url = f"sqlite:///{tmp_path / 'asgi.db'}"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(sync_engine)
+    with Session(sync_engine) as session:
+        AuthorService(session).create({"id": 1, "name": "Ursula K. Le Guin"})
+        BookService(session).bulk_create(
+            [
+                {"id": i, "title": f"Earthsea volume {i}", "author_id": 1, "published_year": 1968 + i}
+                for i in range(1, 31)
+            ]
+            + [{"id": 31, "title": "The Dispossessed", "author_id": 1, "isbn": "0-06-051275-X", "genres": ["Sf"]}],
+            None,
+        )
+        session.commit()
+    sync_engine.dispose()
+
+    engine = create_async_engine(async_url(url))
+    monkeypatch.setattr(async_database, "AsyncSessionLocal", async_sessionmaker(bind=engine, expire_on_commit=False))
+    with TestClient(asgi_app) as client:
+        yield client
+        client.portal.call(engine.dispose)
+
+
+def test_async_url_swaps_driver():
+    assert async_url("postgresql+psycopg2://u:p@db:5432/books") == "postgresql+asyncpg://u:p@db:5432/books"
+    assert async_url("sqlite:///./books.db") == "sqlite+aiosqlite:///./books.db"
+
+
+def test_list_and_paginate(asgi_client):
+    r = asgi_client.get("/books", params={"paginate": "true", "limit": 10, "fields": "title"})
+    assert r.status_code == 200
+    body = r.json()
+    assert [b["id"] for b in body["books"]] == list(range(1, 11))
+    assert set(body["books"][0]) == {"id", "title"}
+
+    r = asgi_client.get("/books", params={"paginate": "true", "limit": 10, "after": body["next_cursor"]})
+    assert r.json()["books"][0]["id"] == 11
+
+
+def test_reads_share_flask_validation_and_errors(asgi_client):
+    r = asgi_client.get("/books", params={"limit": 0, "paginate": "true"})
+    assert r.status_code == 400 and "error" in r.json()
+    assert asgi_client.get("/books/999").json() == {"error": "Book not found"}
+    assert asgi_client.get("/books/isbn/123").status_code == 400
+
+
+def test_isbn_search_and_author_books(asgi_client):
+    r = asgi_client.get("/books/isbn/9780060512750")
+    assert r.status_code == 200
+    assert r.json()["title"] == "The Dispossessed"
+    assert r.json()["genres"] == ["Sf"]
+
+    r = asgi_client.get("/books/search", params={"q": "dispossessed"})
+    assert [b["id"] for b in r.json()["books"]] == [31]
+
+    r = asgi_client.get("/authors/1/books", params={"author_fields": "name"})
+    assert r.json()["author"] == {"id": 1, "name": "Ursula K. Le Guin"}
+    assert len(r.json()["books"]) == 31
+
+
+def test_conditional_get_and_compression(asgi_client):
+    plain = asgi_client.get("/books", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert "last-modified" in plain.headers
+    zipped = asgi_client.get("/books", headers=GZIP)
+    assert zipped.headers["content-encoding"] == "gzip"
+    assert zipped.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+    assert zipped.json() == plain.json()
+
+    r = asgi_client.get("/books", headers={**GZIP, "If-None-Match": zipped.headers["etag"]})
+    assert r.status_code == 304
+    assert r.headers["etag"] == zipped.headers["etag"]
+
+
+def test_other_routes_fall_through_to_flask(asgi_client):
+    r = asgi_client.get("/")
+    assert r.status_code == 200
+    assert asgi_client.post("/books", json={}).status_code == 401
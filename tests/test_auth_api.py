@@ -46,3 +46,36 @@ def test_login_user_not_found(client):
 def test_login_missing_body(client):
     r = client.post("/auth/login", json={})
     assert r.status_code == 400
+
+
+def test_token_user_lookup_is_cached(client, auth_headers):
+    from app.auth import user_cache_stats
+
+    before = user_cache_stats()
+    for author_id in (1, 2, 3):
+        r = client.post("/authors", json={"id": author_id, "name": f"A{author_id}"}, headers=auth_headers)
+        assert r.status_code == 201
+    after = user_cache_stats()
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 2
+
+
+def test_deleted_user_token_rejected(client, auth_headers):
+    from app.database import session_scope
+    from app.models import Users
+
+    assert client.post("/authors", json={"id": 1, "name": "A"}, headers=auth_headers).status_code == 201
+    with session_scope() as session:
+        session.delete(session.query(Users).filter_by(username="testuser").one())
+    r = client.post("/authors", json={"id": 2, "name": "B"}, headers=auth_headers)
+    assert r.status_code == 401
+
+
+def test_register_rejected_with_503_when_hash_queue_full(client, monkeypatch):
+    from app.hashing import hashing_pool
+
+    monkeypatch.setattr(hashing_pool, "workers", 1)
+    monkeypatch.setattr(hashing_pool, "queue_limit", 0)
+    r = client.post("/register", json={"username": "busy", "password": "secret"})
+    assert r.status_code == 503
+    assert "error" in r.json()
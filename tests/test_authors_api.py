@@ -66,6 +66,14 @@ def test_get_author_books_with_books(client, auth_headers, author_id):
     assert r.json()["books"][0]["title"] == "Author Book"
 
 
+def test_get_author_books_sparse_fieldsets(client, auth_headers, author_id):
+    client.post("/books", json={"id": 200, "title": "Author Book", "author_id": author_id}, headers=auth_headers)
+    r = client.get(f"/authors/{author_id}/books", params={"fields": "title", "author_fields": "name"})
+    assert r.status_code == 200
+    assert r.json()["books"] == [{"id": 200, "title": "Author Book"}]
+    assert set(r.json()["author"]) == {"id", "name"}
+
+
 def test_get_author_books_not_found(client):
     r = client.get("/authors/99999/books")
     assert r.status_code == 404
@@ -11,7 +11,46 @@ def test_home(client):
 def test_list_books_empty(client):
     r = client.get("/books")
     assert r.status_code == 200
-    assert r.json() == []
+    data = r.json()
+    assert data["books"] == []
+    assert data["next_cursor"] is None
+
+
+def test_list_books_unpaginated_opt_in(client, auth_headers, author_id):
+    client.post("/books", json={"id": 1, "title": "Legacy", "author_id": author_id}, headers=auth_headers)
+    r = client.get("/books", params={"paginate": "false"})
+    assert r.status_code == 200
+    assert [b["title"] for b in r.json()] == ["Legacy"]
+
+
+def test_list_books_keyset_pagination(client, auth_headers, author_id):
+    for book_id in (3, 1, 5, 2, 4):
+        client.post(
+            "/books",
+            json={"id": book_id, "title": f"Book {book_id}", "author_id": author_id},
+            headers=auth_headers,
+        )
+    r = client.get("/books", params={"limit": 2})
+    page = r.json()
+    assert [b["id"] for b in page["books"]] == [1, 2]
+    assert page["next_cursor"]
+
+    r = client.get("/books", params={"limit": 2, "after": page["next_cursor"]})
+    page = r.json()
+    assert [b["id"] for b in page["books"]] == [3, 4]
+
+    r = client.get("/books", params={"limit": 2, "after": page["next_cursor"]})
+    page = r.json()
+    assert [b["id"] for b in page["books"]] == [5]
+    assert page["next_cursor"] is None
+
+
+def test_list_books_limit_clamped_to_max(client):
+    from app.schemas.validators import MAX_PAGE_SIZE
+
+    r = client.get("/books", params={"limit": MAX_PAGE_SIZE * 10})
+    assert r.status_code == 200
+    assert r.json()["limit"] == MAX_PAGE_SIZE
 
 
 def test_list_books_with_author_filter(client, auth_headers, author_id):
@@ -30,7 +69,7 @@ def test_list_books_with_author_filter(client, auth_headers, author_id):
     assert r.status_code == 201
     r = client.get("/books", params={"author_id": author_id})
     assert r.status_code == 200
-    data = r.json()
+    data = r.json()["books"]
     assert len(data) == 1
     assert data[0]["title"] == "Book One"
     assert data[0]["author_id"] == author_id
@@ -134,3 +173,311 @@ def test_delete_book_forbidden_when_created_by_other_user(client, auth_headers,
 def test_delete_book_not_found(client, auth_headers):
     r = client.delete("/books/99999", headers=auth_headers)
     assert r.status_code == 404
+
+
+@pytest.mark.parametrize("path", ["/books", "/books?paginate=false", "/authors/1/books"])
+def test_book_listing_query_count_is_flat(client, create_books, count_statements, path):
+    create_books([1])
+    with count_statements() as few:
+        assert client.get(path).status_code == 200
+
+    create_books(range(2, 12))
+    with count_statements() as many:
+        r = client.get(path)
+    assert r.status_code == 200
+    assert len(many) == len(few)
+
+
+@pytest.mark.parametrize("path", ["/books", "/books?paginate=false", "/books/1", "/authors/1/books"])
+def test_sparse_fieldset_skips_genres(client, create_books, count_statements, path):
+    create_books([1])
+    sep = "&" if "?" in path else "?"
+    with count_statements() as full:
+        assert client.get(path).status_code == 200
+    with count_statements() as sparse:
+        r = client.get(f"{path}{sep}fields=title")
+    assert r.status_code == 200
+    body = r.json()
+    if isinstance(body, list):
+        book = body[0]
+    else:
+        book = body["books"][0] if "books" in body else {k: v for k, v in body.items() if k != "status"}
+    assert book == {"id": 1, "title": "Book 1"}
+    assert not any("genre" in sql.lower() for sql in sparse)
+    assert any("genre" in sql.lower() for sql in full)
+
+
+def test_sparse_fieldset_keeps_pagination(client, create_books, auth_headers, author_id):
+    create_books([1, 2, 3])
+    page = client.get("/books", params={"limit": 2, "fields": "isbn"}).json()
+    assert page["books"] == [{"id": 1, "isbn": None}, {"id": 2, "isbn": None}]
+    page = client.get("/books", params={"limit": 2, "fields": "isbn", "after": page["next_cursor"]}).json()
+    assert page["books"] == [{"id": 3, "isbn": None}]
+
+
+@pytest.fixture
+def catalog(client, auth_headers, author_id):
+    """Six books: years 1990..1994 plus one without a year; even ids are Fiction, ids 1-3 by a second author."""
+    other = client.post("/authors", json={"id": author_id + 1, "name": "Other"}, headers=auth_headers).json()["id"]
+    books = [
+        {
+            "id": book_id,
+            "title": f"Book {book_id}",
+            "author_id": other if book_id <= 3 else author_id,
+            "published_year": 1989 + book_id if book_id < 6 else None,
+            "isbn": f"97800000000{book_id:02d}",
+            "genres": ["Fiction"] if book_id % 2 == 0 else [],
+        }
+        for book_id in range(1, 7)
+    ]
+    assert client.post("/books/bulk", json=books, headers=auth_headers).json()["created"] == 6
+    return other
+
+
+def _list_ids(client, **params):
+    r = client.get("/books", params={"fields": "id", **params})
+    assert r.status_code == 200, r.text
+    return [b["id"] for b in r.json()["books"]]
+
+
+def test_list_books_filters(client, catalog, author_id):
+    assert _list_ids(client, author_id=catalog) == [1, 2, 3]
+    assert _list_ids(client, genre="Fiction") == [2, 4, 6]
+    assert _list_ids(client, genre="Fiction", author_id=author_id) == [4, 6]
+    assert _list_ids(client, isbn="9780000000005") == [5]
+    assert _list_ids(client, year_from=1991, year_to=1993) == [2, 3, 4]
+    assert _list_ids(client, year_to=1991, sort="-published_year") == [2, 1]
+    assert _list_ids(client, created_by_id=999) == []
+
+
+def _year_sorted(client, sort, limit):
+    seen, cursor = [], None
+    while True:
+        params = {"sort": sort, "limit": limit, **({"after": cursor} if cursor else {})}
+        page = client.get("/books", params=params).json()
+        seen.extend((b["published_year"], b["id"]) for b in page["books"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return seen
+
+
+def test_list_books_sort_by_year_pages_with_cursor(client, catalog):
+    descending = [(1994, 5), (1993, 4), (1992, 3), (1991, 2), (1990, 1), (None, 6)]
+    assert _year_sorted(client, "-published_year", 2) == descending
+    assert _list_ids(client, sort="-id", limit=3) == [6, 5, 4]
+
+
+def test_list_books_sort_by_year_keeps_books_without_a_year_last(client, auth_headers, author_id, catalog):
+    client.post("/books", json={"id": 7, "title": "Book 7", "author_id": author_id}, headers=auth_headers)
+    ascending = [(1990, 1), (1991, 2), (1992, 3), (1993, 4), (1994, 5), (None, 6), (None, 7)]
+    descending = [(1994, 5), (1993, 4), (1992, 3), (1991, 2), (1990, 1), (None, 7), (None, 6)]
+    for limit in (2, 5, 10):
+        assert _year_sorted(client, "published_year", limit) == ascending
+        assert _year_sorted(client, "-published_year", limit) == descending
+    for sort, ids in (("published_year", [1, 2, 3, 4, 5, 6, 7]), ("-published_year", [5, 4, 3, 2, 1, 7, 6])):
+        r = client.get("/books", params={"sort": sort, "paginate": "false", "fields": "id"})
+        assert [b["id"] for b in r.json()] == ids
+    assert _list_ids(client, sort="published_year", author_id=author_id) == [4, 5, 6, 7]
+
+
+def test_get_book_by_isbn_accepts_any_form(client, auth_headers, author_id):
+    client.post(
+        "/books",
+        json={"id": 1, "title": "Clean Code", "author_id": author_id, "isbn": "978-0-13-235088-4"},
+        headers=auth_headers,
+    )
+    for isbn in ("9780132350884", "978-0-13-235088-4", "0132350882", "0-13-235088-2"):
+        r = client.get(f"/books/isbn/{isbn}")
+        assert r.status_code == 200, isbn
+        assert r.json()["id"] == 1
+        assert r.json()["isbn"] == "978-0-13-235088-4"
+    assert client.get("/books/isbn/0132350882", params={"fields": "title"}).json() == {
+        "status": "success",
+        "id": 1,
+        "title": "Clean Code",
+    }
+    assert client.get("/books", params={"isbn": "0-13-235088-2", "fields": "id"}).json()["books"] == [{"id": 1}]
+
+
+def test_get_book_by_isbn_errors(client):
+    assert client.get("/books/isbn/9780132350884").status_code == 404
+    r = client.get("/books/isbn/not-an-isbn")
+    assert r.status_code == 400
+    assert "ISBN" in r.json()["error"]
+
+
+def test_isbn_with_non_ascii_digits_is_rejected(client, auth_headers, author_id):
+    isbn = "\u00b2" * 10  # "²" passes str.isdigit() but is not a digit int() can parse
+    assert client.get(f"/books/isbn/{isbn}").status_code == 400
+    assert client.get("/books", params={"isbn": isbn}).status_code == 400
+    book = {"id": 1, "title": "T", "author_id": author_id, "isbn": "\u0663" * 13}
+    assert client.post("/books", json=book, headers=auth_headers).status_code == 400
+
+
+def test_isbn_is_unique_across_forms(client, auth_headers, author_id):
+    book = {"title": "Clean Code", "author_id": author_id}
+    r = client.post("/books", json={**book, "id": 1, "isbn": "9780132350884"}, headers=auth_headers)
+    assert r.status_code == 201
+    r = client.post("/books", json={**book, "id": 2, "isbn": "0-13-235088-2"}, headers=auth_headers)
+    assert r.status_code == 409
+    client.post("/books", json={**book, "id": 3}, headers=auth_headers)
+    assert client.put("/books/3", json={"isbn": "013235088-2"}, headers=auth_headers).status_code == 409
+
+
+def test_bulk_create_json_array_reports_per_item(client, auth_headers, author_id):
+    client.post("/books", json={"id": 2, "title": "Existing", "author_id": author_id}, headers=auth_headers)
+    items = [
+        {"id": 1, "title": "One", "author_id": author_id, "genres": ["Fiction", "Drama"]},
+        {"id": 2, "title": "Duplicate", "author_id": author_id},
+        {"id": 3, "title": "No Author", "author_id": 99999},
+        {"id": 4, "title": "   ", "author_id": author_id},
+        {"id": 5, "title": "Five", "author_id": author_id, "genres": ["Fiction"]},
+        {"id": 5, "title": "Five again", "author_id": author_id},
+    ]
+    r = client.post("/books/bulk", json=items, headers=auth_headers)
+    assert r.status_code == 200
+    data = r.json()
+    assert data["created"] == 2
+    assert data["failed"] == 4
+    assert [res["status"] for res in data["results"]] == [
+        "created", "error", "error", "error", "created", "error",
+    ]
+    assert "already exists" in data["results"][1]["error"]
+    assert "not found" in data["results"][2]["error"]
+    assert "title" in data["results"][3]["error"]
+
+    r = client.get("/books/1")
+    assert sorted(r.json()["genres"]) == ["Drama", "Fiction"]
+    assert client.get("/books/5").json()["genres"] == ["Fiction"]
+
+
+def test_bulk_create_rejects_isbn_conflicts_before_insert(client, auth_headers, author_id, monkeypatch):
+    from app.services.book_service import BookService
+
+    book = {"title": "Clean Code", "author_id": author_id}
+    client.post("/books", json={**book, "id": 1, "isbn": "9780132350884"}, headers=auth_headers)
+    inserts = []
+    insert_books = BookService._insert_books
+
+    def counting_insert_books(self, payloads, user_id):
+        inserts.append(len(payloads))
+        insert_books(self, payloads, user_id)
+
+    monkeypatch.setattr(BookService, "_insert_books", counting_insert_books)
+    items = [
+        {**book, "id": 2, "isbn": "0-13-235088-2"},
+        {**book, "id": 3, "isbn": "978-0-596-52068-7"},
+        {**book, "id": 4, "isbn": "9780596520687"},
+        {**book, "id": 5},
+    ]
+    data = client.post("/books/bulk", json=items, headers=auth_headers).json()
+    assert [res["status"] for res in data["results"]] == ["error", "created", "error", "created"]
+    assert "already exists" in data["results"][0]["error"]
+    assert "already exists" in data["results"][2]["error"]
+    assert inserts == [2]  # one executemany, no row-by-row retry
+
+
+def test_bulk_create_ndjson_stream(client, auth_headers, author_id, monkeypatch):
+    from app.routers import books
+
+    monkeypatch.setattr(books, "BULK_CHUNK_SIZE", 2)
+    lines = [f'{{"id": {i}, "title": "Book {i}", "author_id": {author_id}}}' for i in range(1, 6)]
+    lines.insert(2, "{not json")
+    r = client.post(
+        "/books/bulk",
+        content="\n".join(lines) + "\n",
+        headers={**auth_headers, "Content-Type": "application/x-ndjson"},
+    )
+    assert r.status_code == 200
+    data = r.json()
+    assert data["created"] == 5
+    assert data["results"][2] == {"index": 2, "id": None, "status": "error", "error": "Invalid JSON"}
+    assert len(client.get("/books").json()["books"]) == 5
+
+
+def test_bulk_create_requires_array(client, auth_headers):
+    r = client.post("/books/bulk", json={"id": 1}, headers=auth_headers)
+    assert r.status_code == 400
+
+
+def test_bulk_create_unauthorized(client):
+    r = client.post("/books/bulk", json=[])
+    assert r.status_code == 401
+
+
+def test_export_ndjson_streams_every_book(client, create_books, monkeypatch):
+    import json
+
+    from app.routers import books
+
+    monkeypatch.setattr(books, "EXPORT_BATCH_SIZE", 2)
+    create_books([3, 1, 2, 5, 4])
+    r = client.get("/books/export")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert [row["id"] for row in rows] == [1, 2, 3, 4, 5]
+    assert sorted(rows[0]["genres"]) == ["Genre 1", "Shared"]
+
+
+def test_export_csv(client, create_books, author_id):
+    import csv
+    import io
+
+    create_books([1, 2])
+    r = client.get("/books/export", params={"format": "csv"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(r.text)))
+    assert rows[0] == ["id", "title", "author_id", "isbn", "published_year", "created_at", "genres"]
+    assert [row[0] for row in rows[1:]] == ["1", "2"]
+    assert sorted(rows[1][6].split(";")) == ["Genre 1", "Shared"]
+
+
+def test_export_invalid_format(client):
+    r = client.get("/books/export", params={"format": "xml"})
+    assert r.status_code == 400
+    assert "format" in r.json()["error"]
+
+
+def test_conditional_get_returns_304_without_querying_books(client, create_books, count_statements):
+    create_books([1])
+    r = client.get("/books")
+    etag = r.headers["etag"]
+    assert r.status_code == 200
+    assert r.headers["last-modified"]
+
+    with count_statements() as statements:
+        r = client.get("/books", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.headers["etag"] == etag
+    assert not any("books" in s for s in statements)
+
+    r = client.get("/books/1", headers={"If-None-Match": etag})
+    assert r.status_code == 200  # ETags are per URL
+
+
+def test_catalog_write_invalidates_etag(client, create_books, auth_headers):
+    create_books([1])
+    etag = client.get("/books/1").headers["etag"]
+    client.put("/books/1", json={"title": "Changed"}, headers=auth_headers)
+    r = client.get("/books/1", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.json()["title"] == "Changed"
+    assert r.headers["etag"] != etag
+
+
+def test_catalog_version_is_reused_between_requests(client, create_books, count_statements):
+    create_books([1])
+    etag = client.get("/books/1").headers["etag"]
+    with count_statements() as statements:
+        assert client.get("/books/1").status_code == 200  # response cache hit
+        assert client.get("/books/1", headers={"If-None-Match": etag}).status_code == 304
+    assert statements == []
+
+
+def test_if_modified_since_returns_304(client, create_books, author_id):
+    create_books([1])
+    last_modified = client.get(f"/authors/{author_id}/books").headers["last-modified"]
+    r = client.get(f"/authors/{author_id}/books", headers={"If-Modified-Since": last_modified})
+    assert r.status_code == 304
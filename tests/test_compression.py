@@ -0,0 +1,71 @@
+"""Compression tests: negotiation, threshold, per-encoding ETags, streaming and precompressed cache entries."""
+import gzip
+
+import pytest
+
+from app import response_cache as response_cache_module
+from app.compression import COMPRESSION_MIN_BYTES, compress_stream
+from app.main import app
+from app.response_cache import cache_key, response_cache
+
+GZIP = {"Accept-Encoding": "gzip"}
+
+
+def test_large_response_is_gzipped_with_distinct_etag(client, create_books):
+    create_books(range(1, 51))
+    plain = client.get("/books", headers={"Accept-Encoding": "identity"})
+    zipped = client.get("/books", headers=GZIP)
+
+    assert "content-encoding" not in plain.headers
+    assert zipped.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in zipped.headers["vary"] and "Accept-Encoding" in plain.headers["vary"]
+    assert zipped.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+    assert int(zipped.headers["content-length"]) < len(plain.content)
+    assert zipped.json() == plain.json()
+
+    r = client.get("/books", headers={**GZIP, "If-None-Match": zipped.headers["etag"]})
+    assert r.status_code == 304
+    assert r.headers["etag"] == zipped.headers["etag"]
+
+
+def test_small_response_is_not_compressed(client, create_books):
+    create_books([1])
+    r = client.get("/books/1", headers=GZIP)
+    assert r.status_code == 200
+    assert len(r.content) < COMPRESSION_MIN_BYTES
+    assert "content-encoding" not in r.headers
+
+
+def test_cached_entry_is_compressed_once(client, create_books, monkeypatch):
+    create_books(range(1, 51))
+    calls = []
+    real_compress = response_cache_module.compress
+
+    def counting_compress(body, encoding):
+        calls.append(encoding)
+        return real_compress(body, encoding)
+
+    monkeypatch.setattr(response_cache_module, "compress", counting_compress)
+
+    bodies = {client.get("/books", headers=GZIP).content for _ in range(3)}
+
+    assert len(bodies) == 1
+    assert calls == ["gzip"]
+    with app.test_request_context("/books"):
+        entry = response_cache.backend.get(cache_key())
+    assert gzip.decompress(entry.encoded["gzip"]) == entry.body
+
+
+def test_export_stream_is_compressed(client, create_books):
+    create_books(range(1, 31))
+    r = client.get("/books/export", headers=GZIP)
+    assert r.headers["content-encoding"] == "gzip"
+    assert "content-length" not in r.headers
+    assert len(r.text.splitlines()) == 30
+
+
+@pytest.mark.parametrize("flush_every", [1, 10_000_000])
+def test_compress_stream_round_trip(monkeypatch, flush_every):
+    monkeypatch.setattr("app.compression._STREAM_FLUSH_BYTES", flush_every)
+    chunks = [f"line {i}\n" for i in range(1000)]
+    assert gzip.decompress(b"".join(compress_stream(iter(chunks), "gzip"))) == "".join(chunks).encode()
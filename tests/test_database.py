@@ -0,0 +1,39 @@
+"""Connection pool instrumentation tests."""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.database import InstrumentedQueuePool, pool_stats
+
+
+@pytest.fixture
+def small_engine(tmp_path):
+    eng = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+    yield eng
+    eng.dispose()
+
+
+def test_pool_stats_track_checkouts_overflow_and_timeouts(small_engine):
+    first = small_engine.connect()
+    second = small_engine.connect()  # uses the single overflow slot
+    stats = pool_stats(small_engine.pool)
+    assert stats["checked_out"] == 2
+    assert stats["overflow"] == 1
+    assert stats["overflow_peak"] == 1
+
+    with pytest.raises(PoolTimeoutError):
+        small_engine.connect()
+    first.close()
+    second.close()
+
+    stats = pool_stats(small_engine.pool)
+    assert stats["checkouts"] == 2
+    assert stats["timeouts"] == 1
+    assert stats["checked_out"] == 0
+    assert stats["wait_seconds_max"] >= 0.0
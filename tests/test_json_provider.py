@@ -0,0 +1,51 @@
+"""JSON provider tests: both encoders produce the same ISO 8601 output."""
+import datetime
+import json
+
+import pytest
+from flask import Flask
+
+from app.json_provider import OrjsonProvider, StdlibJSONProvider, orjson
+
+PAYLOAD = {
+    "id": 1,
+    "created_at": datetime.datetime(2024, 5, 1, 8, 30, 0, 250000),
+    "published": datetime.date(2024, 5, 1),
+    "genres": ["Fiction"],
+}
+EXPECTED = {
+    "id": 1,
+    "created_at": "2024-05-01T08:30:00.250000",
+    "published": "2024-05-01",
+    "genres": ["Fiction"],
+}
+
+
+@pytest.mark.parametrize(
+    "provider",
+    [
+        StdlibJSONProvider,
+        pytest.param(OrjsonProvider, marks=pytest.mark.skipif(orjson is None, reason="orjson not installed")),
+    ],
+)
+def test_provider_encodes_datetimes_as_iso8601(provider):
+    app = Flask(__name__)
+    with app.app_context():
+        response = provider(app).response(PAYLOAD)
+    assert response.mimetype == "application/json"
+    assert json.loads(response.get_data()) == EXPECTED
+
+
+@pytest.mark.skipif(orjson is None, reason="orjson not installed")
+@pytest.mark.parametrize("kwargs", [{}, {"indent": 2}])
+def test_orjson_provider_dumps_accepts_a_default(kwargs):
+    app = Flask(__name__)
+    with app.app_context():
+        encoded = OrjsonProvider(app).dumps({"tags": {"a"}}, default=sorted, **kwargs)
+    assert json.loads(encoded) == {"tags": ["a"]}
+
+
+def test_api_returns_iso_created_at(client, auth_headers, author_id):
+    client.post("/books", json={"id": 1, "title": "T", "author_id": author_id}, headers=auth_headers)
+    created_at = client.get("/books/1").json()["created_at"]
+    assert datetime.datetime.fromisoformat(created_at)
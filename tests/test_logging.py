@@ -0,0 +1,47 @@
+"""Request logging: one structured line per request, written off the request thread, with sampling."""
+import json
+import logging
+
+from app import logging_config
+from app.logging_config import JsonFormatter, _NonBlockingQueueHandler
+
+
+def _request_lines(caplog):
+    return [rec.fields for rec in caplog.records if rec.getMessage() == "request completed"]
+
+
+def test_one_line_per_request_with_db_stats(client, caplog):
+    with caplog.at_level(logging.INFO, logger="app"):
+        r = client.get("/books/1")
+    (fields,) = _request_lines(caplog)
+    assert fields["request_id"] == r.headers["x-request-id"]
+    assert fields["endpoint"] == "books.get_book_by_id"
+    assert fields["status"] == 404
+    assert fields["path"] == "/books/1"
+    assert fields["db_queries"] == int(r.headers["x-db-queries"])
+    assert fields["duration_ms"] >= fields["db_ms"] >= 0
+
+
+def test_successful_requests_are_sampled_errors_are_not(client, caplog, monkeypatch):
+    monkeypatch.setattr(logging_config, "LOG_REQUEST_SAMPLE_RATE", 0.0)
+    with caplog.at_level(logging.INFO, logger="app"):
+        assert client.get("/").status_code == 200
+        assert client.get("/books/1").status_code == 404
+    assert [f["status"] for f in _request_lines(caplog)] == [404]
+
+
+def test_json_formatter_emits_single_line():
+    record = logging.LogRecord("app.main", logging.INFO, __file__, 1, "request %s", ("done",), None)
+    record.fields = {"status": 200, "path": "/books?q=a\nb"}
+    line = JsonFormatter().format(record)
+    assert "\n" not in line
+    assert json.loads(line) == {**json.loads(line), "msg": "request done", "status": 200, "level": "INFO"}
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = _NonBlockingQueueHandler(logging_config.queue.Queue(1))
+    before = logging_config.LOG_RECORDS_DROPPED.value()
+    for _ in range(3):
+        handler.emit(logging.LogRecord("app", logging.INFO, __file__, 1, "x", None, None))
+    assert handler.queue.qsize() == 1
+    assert logging_config.LOG_RECORDS_DROPPED.value() - before == 2
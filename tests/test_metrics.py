@@ -0,0 +1,93 @@
+"""Metrics registry and /metrics endpoint tests."""
+from app import metrics as metrics_module
+from app.metrics import (
+    Histogram,
+    MetricsRegistry,
+    REQUEST_DURATION,
+    REQUESTS_IN_FLIGHT,
+    merge_expositions,
+    parameter_shape,
+)
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    hist = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        hist.observe(value, ("a",))
+    text = registry.render()
+    assert 'latency_seconds_bucket{route="a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="a",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{route="a",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{route="a"} 3' in text
+    assert isinstance(hist, Histogram)
+
+
+def test_metrics_endpoint_reports_requests_and_db(client):
+    labels = ("GET", "books.get_books", "200")
+    before, _ = REQUEST_DURATION.value(labels)
+    assert client.get("/books").status_code == 200
+    assert client.get("/books").status_code == 200
+    after, _ = REQUEST_DURATION.value(labels)
+    assert after - before == 2
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    text = r.text
+    assert '# TYPE http_request_duration_seconds histogram' in text
+    assert 'http_requests_total{method="GET",endpoint="books.get_books",status="200"}' in text
+    assert 'http_request_db_queries_bucket{endpoint="books.get_books",le="1"}' in text
+    assert "db_pool_size" in text
+    assert "auth_user_cache_hits_total" in text
+    assert REQUESTS_IN_FLIGHT.value() == 0
+
+
+def test_merge_expositions_labels_each_worker():
+    text = (
+        "# HELP jobs_total Jobs.\n# TYPE jobs_total counter\njobs_total 2\n"
+        "# HELP latency_seconds Latency.\n# TYPE latency_seconds histogram\n"
+        'latency_seconds_bucket{le="+Inf"} 1\nlatency_seconds_count 1\n'
+    )
+    merged = merge_expositions({1: text, 0: text.replace("jobs_total 2", "jobs_total 5")})
+    lines = merged.splitlines()
+    assert lines.count("# TYPE jobs_total counter") == 1
+    assert lines[2:4] == ['jobs_total{worker="0"} 5', 'jobs_total{worker="1"} 2']
+    assert 'latency_seconds_bucket{worker="1",le="+Inf"} 1' in lines
+    assert 'latency_seconds_count{worker="0"} 1' in lines
+
+
+def test_metrics_endpoint_merges_prefork_workers(client, tmp_path, monkeypatch):
+    (tmp_path / "worker-7.prom").write_text("# HELP other_total Other.\n# TYPE other_total counter\nother_total 3\n")
+    monkeypatch.setattr(metrics_module, "_worker_slot", 0)
+    monkeypatch.setattr(metrics_module, "_worker_dir", str(tmp_path))
+
+    text = client.get("/metrics").text
+    assert 'other_total{worker="7"} 3' in text
+    assert 'db_pool_size{worker="0"}' in text
+    assert (tmp_path / "worker-0.prom").exists()
+
+
+def test_db_stats_headers_match_statements(client, count_statements):
+    with count_statements() as statements:
+        r = client.get("/books/1")
+    assert r.status_code == 404
+    assert int(r.headers["x-db-queries"]) == len(statements) > 0
+    assert r.headers["server-timing"].startswith("db;dur=")
+    assert f'desc="{len(statements)} queries"' in r.headers["server-timing"]
+
+
+def test_slow_query_log_shows_parameter_shape_not_values(client, auth_headers, author_id, monkeypatch, caplog):
+    monkeypatch.setattr(metrics_module, "DB_SLOW_QUERY_MS", 1e-9)
+    with caplog.at_level("WARNING"):
+        client.get("/books/isbn/9780132350884")
+    slow = [rec.getMessage() for rec in caplog.records if rec.getMessage().startswith("Slow query")]
+    assert any("books.isbn13" in msg for msg in slow)
+    assert all("9780132350884" not in msg for msg in slow)
+    assert any("(str" in msg or ": str" in msg for msg in slow)
+
+
+def test_parameter_shape():
+    assert parameter_shape({"id_1": 3, "title": "x"}) == "{id_1: int, title: str}"
+    assert parameter_shape([(1, "a"), (2, "b")], executemany=True) == "2 x (int, str)"
+    assert parameter_shape(()) == "()"
@@ -0,0 +1,93 @@
+"""Prefork master: dead workers are replaced, crash loops back off, SIGTERM shuts down cleanly."""
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from app import prefork
+from app.prefork import PreforkServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _children(pid: int) -> list:
+    with open(f"/proc/{pid}/task/{pid}/children", encoding="ascii") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def _responds(port: int) -> bool:
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as r:
+            return r.status == 200
+    except (urllib.error.URLError, ConnectionError):
+        return False
+
+
+def _wait_for(predicate, timeout: float = 20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = predicate()
+        if result:
+            return result
+        time.sleep(0.1)
+    raise AssertionError("condition not met in time")
+
+
+def test_crashing_slot_backs_off(monkeypatch):
+    monkeypatch.setattr(prefork, "PREFORK_RESTART_BACKOFF_MAX", 30.0)
+    server = PreforkServer(app=None, host="127.0.0.1", port=0, workers=1)
+    delays = []
+    for _ in range(8):
+        before = time.monotonic()
+        server._schedule_restart(0, uptime=0.1)
+        delays.append(round(server._restart_at[0] - before))
+    assert delays == [0, 1, 2, 4, 8, 16, 30, 30]
+
+    # A backing-off slot is left empty...
+    server._fill_slots(None, "")
+    assert server._slots == {}
+    # ...and a worker that stayed up long enough resets the backoff.
+    server._schedule_restart(0, uptime=prefork.PREFORK_STABLE_UPTIME)
+    assert server._crashes[0] == 1
+    assert server._restart_at[0] <= time.monotonic()
+
+
+@pytest.mark.skipif(not os.path.exists(f"/proc/{os.getpid()}/task"), reason="needs fork and /proc")
+def test_killed_worker_is_replaced_and_sigterm_stops_master():
+    port = _free_port()
+    code = (
+        "from app.main import app; from app.prefork import PreforkServer; "
+        f"PreforkServer(app, '127.0.0.1', {port}, workers=1, threads=2).run()"
+    )
+    env = {**os.environ, "PYTHONPATH": ROOT, "AUTH_HASH_WORKERS": "0", "LOG_LEVEL": "ERROR"}
+    master = subprocess.Popen(  # pylint: disable=consider-using-with
+        [sys.executable, "-c", code], cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        (worker,) = _wait_for(lambda: _children(master.pid))
+        _wait_for(lambda: _responds(port))
+
+        os.kill(worker, signal.SIGKILL)
+        (replacement,) = _wait_for(lambda: [pid for pid in _children(master.pid) if pid != worker])
+        assert replacement != worker
+        _wait_for(lambda: _responds(port))
+
+        master.send_signal(signal.SIGTERM)
+        assert master.wait(timeout=30) == 0
+        assert not os.path.exists(f"/proc/{replacement}")
+    finally:
+        if master.poll() is None:
+            master.kill()
+            master.wait()
@@ -0,0 +1,71 @@
+"""Opt-in request profiler: admin-only, sampled, and absent unless enabled."""
+import time
+
+import httpx
+import pytest
+
+from app import profiler
+from app.main import create_app
+from app.routers import books as books_router
+
+PROFILE = {"X-Profile": "1"}
+
+
+@pytest.fixture
+def profiled_client(db_tables, monkeypatch):
+    monkeypatch.setattr(profiler, "PROFILER_ENABLED", True)
+    monkeypatch.setattr(profiler, "PROFILER_INTERVAL_MS", 0.5)
+    real_listing = books_router.books_listing
+
+    def slow_books_listing(session, args):
+        time.sleep(0.05)
+        return real_listing(session, args)
+
+    monkeypatch.setattr(books_router, "books_listing", slow_books_listing)
+    with httpx.Client(transport=httpx.WSGITransport(app=create_app()), base_url="http://testserver") as c:
+        yield c
+
+
+def _login(client, username):
+    client.post("/register", json={"username": username, "password": "pw"})
+    r = client.post("/auth/login", json={"username": username, "password": "pw"})
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def test_disabled_profiler_registers_no_hooks():
+    app = create_app()
+    hooks = [f.__name__ for f in app.before_request_funcs.get(None, [])]
+    assert "_start_profile" not in hooks
+
+
+def test_admin_gets_collapsed_stacks(profiled_client, monkeypatch):
+    headers = _login(profiled_client, "admin")
+    monkeypatch.setattr(profiler, "PROFILER_ADMIN_USER_IDS", frozenset({1}))
+    r = profiled_client.get("/books", headers={**headers, **PROFILE})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    assert r.headers["x-profiled-status"] == "200"
+    assert int(r.headers["x-profile-samples"]) > 0
+    stack, count = r.text.splitlines()[0].rsplit(" ", 1)
+    assert "slow_books_listing (test_profiler.py" in r.text
+    assert ";" in stack and int(count) > 0
+
+
+def test_non_admin_and_unsampled_requests_are_served_normally(profiled_client, monkeypatch):
+    headers = _login(profiled_client, "someone")
+    monkeypatch.setattr(profiler, "PROFILER_ADMIN_USER_IDS", frozenset({999}))
+    assert profiled_client.get("/books", headers={**headers, **PROFILE}).json()["books"] == []
+
+    monkeypatch.setattr(profiler, "PROFILER_ADMIN_USER_IDS", frozenset({1}))
+    monkeypatch.setattr(profiler, "PROFILER_SAMPLE_RATE", 0.0)
+    assert profiled_client.get("/books", params={"_profile": "1"}, headers=headers).json()["books"] == []
+
+
+def test_profile_is_stored_when_output_dir_is_set(profiled_client, monkeypatch, tmp_path):
+    headers = _login(profiled_client, "admin")
+    monkeypatch.setattr(profiler, "PROFILER_ADMIN_USER_IDS", frozenset({1}))
+    monkeypatch.setattr(profiler, "PROFILER_OUTPUT_DIR", str(tmp_path))
+    r = profiled_client.get("/books", params={"_profile": "1"}, headers=headers)
+    assert r.json()["books"] == []
+    stored = (tmp_path / f"{r.headers['x-profile-id']}.collapsed").read_text()
+    assert "slow_books_listing" in stored
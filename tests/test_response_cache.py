@@ -0,0 +1,119 @@
+"""Response cache tests: hits, precise tag invalidation, coherence with writes from other processes."""
+import pytest
+from sqlalchemy import text
+
+from app.conditional import clear_catalog_version_cache
+from app.database import engine
+from app.response_cache import RedisBackend, response_cache
+
+
+def _book_queries(statements):
+    return [s for s in statements if "FROM books" in s]
+
+
+def test_repeat_read_is_served_from_cache(client, create_books, count_statements):
+    create_books([1])
+    first = client.get("/books/1")
+    with count_statements() as statements:
+        second = client.get("/books/1")
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"]
+    assert not _book_queries(statements)
+    assert response_cache.backend.stats()["hits"] >= 1
+
+
+def test_write_invalidates_only_touched_entries(client, create_books, auth_headers, count_statements):
+    create_books([1, 2])
+    client.get("/books/1")
+    client.get("/books/2")
+
+    client.put("/books/1", json={"title": "Renamed"}, headers=auth_headers)
+
+    with count_statements() as statements:
+        r = client.get("/books/2")
+    assert r.json()["title"] == "Book 2"
+    assert not _book_queries(statements)
+
+    with count_statements() as statements:
+        r = client.get("/books/1")
+    assert r.json()["title"] == "Renamed"
+    assert _book_queries(statements)
+
+
+def test_foreign_write_clears_local_cache(client, create_books, count_statements):
+    create_books([1])
+    client.get("/books/1")
+    with engine.connect() as conn, conn.begin():
+        # Another server process writing: bumps the version without notifying this one
+        conn.execute(text("UPDATE books SET title = 'Elsewhere' WHERE id = 1"))
+        conn.execute(text("UPDATE catalog_version SET version = version + 1"))
+    clear_catalog_version_cache()  # as once CATALOG_VERSION_TTL_SECONDS has passed
+
+    with count_statements() as statements:
+        r = client.get("/books/1")
+    assert r.json()["title"] == "Elsewhere"
+    assert _book_queries(statements)
+
+
+def test_cache_metrics_exposed(client):
+    client.get("/books")
+    text_body = client.get("/metrics").text
+    assert "response_cache_hit_ratio" in text_body
+    assert "response_cache_evictions_total" in text_body
+
+
+@pytest.fixture
+def redis_cache(monkeypatch):
+    """Swap the response cache onto a RedisBackend backed by fakeredis, as with RESPONSE_CACHE_URL set."""
+    fakeredis = pytest.importorskip("fakeredis")
+    redis = pytest.importorskip("redis")
+    monkeypatch.setattr(redis, "Redis", fakeredis.FakeRedis)
+    backend = RedisBackend("redis://localhost:6379/0", ttl=30)
+    monkeypatch.setattr(response_cache, "backend", backend)
+    monkeypatch.setattr(response_cache, "shared", True)
+    yield backend
+    backend.clear()
+
+
+def test_redis_backend_serves_repeat_reads(client, create_books, redis_cache, count_statements):
+    create_books([1])
+    first = client.get("/books/1")
+    with count_statements() as statements:
+        second = client.get("/books/1")
+        gzipped = client.get("/books/1", headers={"Accept-Encoding": "gzip"})
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"]
+    assert gzipped.json() == first.json()
+    assert not _book_queries(statements)
+    assert redis_cache.stats()["hits"] == 2
+
+
+def test_redis_backend_invalidates_by_tag(client, create_books, auth_headers, redis_cache):
+    create_books([1])
+    client.get("/books/1")
+    client.put("/books/1", json={"title": "Renamed"}, headers=auth_headers)
+    assert client.get("/books/1").json()["title"] == "Renamed"
+
+
+def test_redis_backend_never_serves_a_body_from_before_a_foreign_write(client, create_books, redis_cache):
+    create_books([1])
+    stale = client.get("/books/1")
+    with engine.connect() as conn, conn.begin():
+        # Another process writing without this one's invalidation reaching the entry in time
+        conn.execute(text("UPDATE books SET title = 'Elsewhere' WHERE id = 1"))
+        conn.execute(text("UPDATE catalog_version SET version = version + 1"))
+    clear_catalog_version_cache()  # as once CATALOG_VERSION_TTL_SECONDS has passed
+
+    r = client.get("/books/1")
+    assert r.json()["title"] == "Elsewhere"
+    assert r.headers["etag"] != stale.headers["etag"]
+    assert client.get("/books/1", headers={"If-None-Match": stale.headers["etag"]}).status_code == 200
+
+
+def test_redis_backend_size_counts_only_cache_entries(client, create_books, redis_cache):
+    create_books([1])
+    redis_cache._redis.set("unrelated", "1")
+    client.get("/books/1")
+    client.get("/books")
+    assert redis_cache.stats()["size"] == 2
@@ -0,0 +1,75 @@
+"""Title search tests (SQLite FTS5 fallback): matching, ranking, pagination and index maintenance."""
+import pytest
+
+TITLES = {
+    1: "The Dragon Book",
+    2: "Dragons",
+    3: "Cooking for Dragons and Knights",
+    4: "A Cookbook",
+}
+
+
+@pytest.fixture
+def books(client, auth_headers, author_id):
+    for book_id, title in TITLES.items():
+        r = client.post("/books", json={"id": book_id, "title": title, "author_id": author_id}, headers=auth_headers)
+        assert r.status_code == 201
+
+
+def _ids(r):
+    assert r.status_code == 200
+    return [b["id"] for b in r.json()["books"]]
+
+
+def test_search_matches_stemmed_words_best_first(client, books):
+    ids = _ids(client.get("/books/search", params={"q": "dragon"}))
+    assert sorted(ids) == [1, 2, 3]
+    assert ids[0] == 2  # the shortest title containing the word ranks highest
+    assert _ids(client.get("/books/search", params={"q": "dragons cooking"})) == [3]
+    assert _ids(client.get("/books/search", params={"q": "unicorn"})) == []
+
+
+def test_search_input_is_not_query_syntax(client, books):
+    assert _ids(client.get("/books/search", params={"q": 'dragon" OR cook*'})) == []
+    assert _ids(client.get("/books/search", params={"q": "NOT dragon"})) == []
+
+
+def test_search_pages_follow_rank_order(client, books):
+    expected = _ids(client.get("/books/search", params={"q": "dragon"}))
+    seen, cursor = [], None
+    while True:
+        params = {"q": "dragon", "limit": 1, **({"after": cursor} if cursor else {})}
+        page = client.get("/books/search", params=params).json()
+        seen.extend(b["id"] for b in page["books"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == expected
+
+
+def test_search_index_follows_writes(client, books, auth_headers):
+    client.put("/books/4", json={"title": "A Dragon Cookbook"}, headers=auth_headers)
+    client.delete("/books/2", headers=auth_headers)
+    assert sorted(_ids(client.get("/books/search", params={"q": "dragon"}))) == [1, 3, 4]
+
+
+def test_search_fields_and_author_filter(client, books, author_id):
+    r = client.get("/books/search", params={"q": "cookbook", "fields": "title", "author_id": author_id})
+    assert r.json()["books"] == [{"id": 4, "title": "A Cookbook"}]
+    assert _ids(client.get("/books/search", params={"q": "cookbook", "author_id": author_id + 1})) == []
+
+
+@pytest.mark.parametrize(
+    "params, message",
+    [
+        ({}, "'q' is required"),
+        ({"q": "  "}, "'q' is required"),
+        ({"q": "?!"}, "at least one word"),
+        ({"q": "x" * 201}, "must not exceed"),
+        ({"q": "dragon", "after": "bogus"}, "cursor"),
+    ],
+)
+def test_search_rejects_invalid_queries(client, params, message):
+    r = client.get("/books/search", params=params)
+    assert r.status_code == 400
+    assert message in r.json()["error"]
@@ -4,6 +4,7 @@ import pytest
 
 from app.database import SessionLocal
 from app.models import Genre
+from app.schemas import book_row_to_dict, book_to_dict
 from app.services import UserService, AuthorService, BookService
 
 
@@ -49,6 +50,29 @@ def test_user_service_register_and_authenticate(db_session):
     assert auth_err_missing == "user_not_found"
 
 
+def test_user_service_hashes_outside_the_transaction(db_session, monkeypatch):
+    """bcrypt never runs while the session holds a pooled connection, and duplicates are never hashed."""
+    from app.services import user_service
+
+    calls = []
+
+    def checked(fn):
+        def wrapper(*args):
+            calls.append(db_session.in_transaction())
+            return fn(*args)
+
+        return wrapper
+
+    monkeypatch.setattr(user_service, "hash_password", checked(user_service.hash_password))
+    monkeypatch.setattr(user_service, "verify_password", checked(user_service.verify_password))
+    service = UserService(db_session)
+
+    assert service.register("hash_user", "pw")[1] is None
+    assert service.register("hash_user", "pw")[1] == "Username already exists"
+    assert service.authenticate("hash_user", "pw")[1] is None
+    assert calls == [False, False]
+
+
 def test_author_and_book_lifecycle(db_session):
     user_service = UserService(db_session)
     author_service = AuthorService(db_session)
@@ -279,3 +303,89 @@ def test_genres_reused_between_books(db_session):
     assert names == {"Fiction", "Sci-Fi", "Drama"}
 
 
+def test_get_or_create_genres_is_two_round_trips(db_session, count_statements):
+    """Ten new genres resolve with one SELECT plus one INSERT ... ON CONFLICT; reuse needs only the SELECT."""
+    book_service = BookService(db_session)
+    names = [f"Genre {i}" for i in range(10)]
+
+    with count_statements() as statements:
+        created = book_service._get_or_create_genres(names + [" Genre 0 "])
+    assert len(statements) == 2
+    assert [g.name for g in created] == names
+    db_session.commit()
+
+    with count_statements() as statements:
+        reused = book_service._get_or_create_genres(names)
+    assert len(statements) == 1
+    assert [g.id for g in reused] == [g.id for g in created]
+    assert db_session.query(Genre).count() == 10
+
+
+def test_get_with_books_selects_only_requested_columns(db_session, count_statements):
+    """fields / author_fields narrow the joined SELECT, and genres are only queried when asked for."""
+    user, _ = UserService(db_session).register("fields_user", "pw")
+    author_service = AuthorService(db_session)
+    author, _ = author_service.create({"id": 8, "name": "Author8", "bio": "Long bio", "country": None})
+    BookService(db_session).create({"id": 80, "title": "Book 80", "author_id": 8, "genres": ["Drama"]}, user)
+    db_session.expunge_all()
+
+    with count_statements() as statements:
+        author = author_service.get_with_books(8, fields=("id", "title"), author_fields=("id", "name"))
+    assert len(statements) == 1
+    assert "title" in statements[0] and "name" in statements[0]
+    assert "isbn" not in statements[0] and "bio" not in statements[0]
+    assert [b.title for b in author.books] == ["Book 80"]
+    db_session.expunge_all()
+
+    with count_statements() as statements:
+        author = author_service.get_with_books(8)
+    assert len(statements) == 2
+    assert [g.name for g in author.books[0].genres] == ["Drama"]
+
+
+def test_catalog_version_is_bumped_last(db_session, count_statements):
+    """Writers only lock the shared catalog_version row for the commit, not while the write itself runs."""
+    user, _ = UserService(db_session).register("bump_user", "pw")
+    AuthorService(db_session).create({"id": 7, "name": "Author7", "bio": None, "country": None})
+    book_service = BookService(db_session)
+    payloads = [{"id": book_id, "title": f"Book {book_id}", "author_id": 7, "genres": ["Drama"]} for book_id in (1, 2)]
+
+    with count_statements() as statements:
+        assert book_service.bulk_create(payloads, user.id) == [None, None]
+    assert statements[-1].startswith("UPDATE catalog_version")
+    assert sum("catalog_version" in statement for statement in statements) == 1
+
+    with count_statements() as statements:
+        _, err = book_service.create({"id": 3, "title": "Book 3", "author_id": 7}, user)
+    assert err is None
+    assert statements[-1].startswith("UPDATE catalog_version")
+
+
+def test_projected_rows_match_orm_serialization(db_session, count_statements):
+    """list_rows / list_page_rows / iter_rows serialize exactly like book_to_dict, in one statement."""
+    user, _ = UserService(db_session).register("rows_user", "pw")
+    author, _ = AuthorService(db_session).create({"id": 9, "name": "Author9", "bio": None, "country": None})
+    book_service = BookService(db_session)
+    for book_id, genres in ((70, ["Fiction", "Sci-Fi"]), (71, []), (72, ["Drama"])):
+        _, err = book_service.create({"id": book_id, "title": f"Book {book_id}", "author_id": author.id,
+                                      "genres": genres}, user)
+        assert err is None
+
+    expected = [book_to_dict(b) for b in sorted(book_service.list_all(), key=lambda b: b.id)]
+    for book in expected:
+        book["genres"] = sorted(book["genres"])
+
+    def normalized(rows):
+        return [{**book_row_to_dict(row), "genres": sorted(row[-1])} for row in rows]
+
+    with count_statements() as statements:
+        rows = book_service.list_rows()
+    assert len(statements) == 1
+    assert normalized(rows) == expected
+
+    page, next_key = book_service.list_page_rows(2)
+    assert normalized(page) == expected[:2] and next_key == (71,)
+    page, next_key = book_service.list_page_rows(2, after_key=next_key)
+    assert normalized(page) == expected[2:] and next_key is None
+
+    assert normalized(book_service.iter_rows(author_id=author.id, batch_size=2)) == expected
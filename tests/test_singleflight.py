@@ -0,0 +1,71 @@
+"""Single-flight request coalescing tests."""
+import threading
+import time
+
+import pytest
+
+from app.singleflight import SingleFlight
+
+
+def _run_concurrently(n, target):
+    threads = [threading.Thread(target=target) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def test_concurrent_callers_share_one_execution():
+    group = SingleFlight()
+    calls = []
+    results = []
+    start = threading.Barrier(5)
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return b"payload"
+
+    def worker():
+        start.wait()
+        results.append(group.do("GET:/books?author_id=1", slow, timeout=5))
+
+    _run_concurrently(5, worker)
+    assert len(calls) == 1
+    assert [r[0] for r in results] == [b"payload"] * 5
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert group.in_flight() == 0
+
+
+def test_leader_exception_propagates_to_followers():
+    group = SingleFlight()
+    errors = []
+    start = threading.Barrier(3)
+
+    def failing():
+        time.sleep(0.1)
+        raise LookupError("not found")
+
+    def worker():
+        start.wait()
+        with pytest.raises(LookupError):
+            group.do("key", failing, timeout=5)
+        errors.append(1)
+
+    _run_concurrently(3, worker)
+    assert len(errors) == 3
+
+
+def test_sequential_calls_are_not_shared():
+    group = SingleFlight()
+    assert group.do("key", lambda: 1, timeout=1) == (1, False)
+    assert group.do("key", lambda: 2, timeout=1) == (2, False)
+
+
+def test_coalesced_endpoint_returns_normal_response(client, auth_headers, author_id):
+    client.post("/books", json={"id": 1, "title": "Solo", "author_id": author_id}, headers=auth_headers)
+    r = client.get("/books", params={"author_id": author_id})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/json")
+    assert r.json()["books"][0]["title"] == "Solo"
+    assert client.get("/books/404").status_code == 404
@@ -1,4 +1,7 @@
 """Validation tests: invalid payloads return 400 with expected error messages."""
+import pytest
+
+from app.schemas import encode_cursor
 
 
 def test_register_empty_body(client):
@@ -277,3 +280,58 @@ def test_books_list_author_id_not_integer(client):
     assert r.status_code == 400
     assert "author_id" in r.json()["error"].lower()
     assert "integer" in r.json()["error"].lower()
+
+
+def test_books_list_limit_not_integer(client):
+    r = client.get("/books", params={"limit": "ten"})
+    assert r.status_code == 400
+    assert "limit" in r.json()["error"].lower()
+
+
+def test_books_list_limit_below_one(client):
+    r = client.get("/books", params={"limit": 0})
+    assert r.status_code == 400
+    assert "limit" in r.json()["error"].lower()
+
+
+def test_books_list_invalid_cursor(client):
+    r = client.get("/books", params={"after": "not-a-cursor"})
+    assert r.status_code == 400
+    assert "cursor" in r.json()["error"].lower()
+
+
+@pytest.mark.parametrize("fields", ["", " , ", "title,rating"])
+def test_books_list_invalid_fields(client, fields):
+    r = client.get("/books", params={"fields": fields})
+    assert r.status_code == 400
+    assert "fields" in r.json()["error"].lower()
+
+
+def test_author_books_invalid_author_fields(client):
+    r = client.get("/authors/1/books", params={"author_fields": "email"})
+    assert r.status_code == 400
+    assert "author_fields" in r.json()["error"]
+
+
+@pytest.mark.parametrize(
+    "params, message",
+    [
+        ({"year_from": "199x"}, "'year_from' must be an integer"),
+        ({"year_from": 2000, "year_to": 1990}, "must not be greater"),
+        ({"sort": "title"}, "'sort' must be one of"),
+        ({"genre": " "}, "'genre' must be a non-empty string"),
+        ({"year_from": 1990, "sort": "id"}, "requires sort=published_year"),
+        ({"genre": "Fiction", "sort": "published_year"}, "no index"),
+        ({"created_by_id": 1, "sort": "-published_year"}, "no index"),
+    ],
+)
+def test_books_list_rejects_unindexed_or_invalid_filters(client, params, message):
+    r = client.get("/books", params=params)
+    assert r.status_code == 400
+    assert message in r.json()["error"]
+
+
+def test_books_list_cursor_must_match_sort(client):
+    r = client.get("/books", params={"sort": "published_year", "after": encode_cursor(5)})
+    assert r.status_code == 400
+    assert "cursor" in r.json()["error"]